@@ -1,7 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
+        from .search import ensure_search_index
+
+        # Миграции, пересоздающие blog_post в SQLite, теряют триггеры
+        # поиска: индекс проверяется и ставится после каждого migrate.
+        post_migrate.connect(ensure_search_index, sender=self)
@@ -0,0 +1,192 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+from blogicum.settings import PAGE_CACHE_TIMEOUT
+
+CARD_VERSION_KEY = 'blog:card-version:{}'
+AUTHOR_CARDS_KEY = 'blog:author-cards:{}'
+CARDS_GENERATION_KEY = 'blog:cards-generation'
+PAGES_GENERATION_KEY = 'blog:pages-generation'
+LISTS_GENERATION_KEY = 'blog:lists-generation'
+POST_PAGE_KEY = 'blog:post-page:{}'
+PAGE_KEY = 'blog:page:{}:{}:{}'
+
+
+def new_version():
+    return time.time_ns()
+
+
+def bump_card(post_id):
+    cache.set(CARD_VERSION_KEY.format(post_id), new_version(), None)
+
+
+def bump_author_cards(author_id):
+    cache.set(AUTHOR_CARDS_KEY.format(author_id), new_version(), None)
+
+
+def bump_all_cards():
+    cache.set(CARDS_GENERATION_KEY, new_version(), None)
+
+
+def bump_pages():
+    """Сбрасывает все страницы: правки категорий, мест и авторов."""
+    cache.set(PAGES_GENERATION_KEY, new_version(), None)
+
+
+def bump_lists():
+    """Сбрасывает страницы лент: главную, категорий и профилей."""
+    cache.set(LISTS_GENERATION_KEY, new_version(), None)
+
+
+def bump_post_page(post_id):
+    cache.set(POST_PAGE_KEY.format(post_id), new_version(), None)
+
+
+def get_versions(*keys):
+    """Текущие значения ключей версий.
+
+    Пропавший из кэша ключ получает новое значение, а не «ноль»,
+    чтобы после вытеснения не отдать устаревшие данные.
+    """
+    versions = cache.get_many(keys)
+    missing = {key: new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def card_version(post_id, author_id):
+    return '{}.{}.{}'.format(*get_versions(
+        CARDS_GENERATION_KEY,
+        CARD_VERSION_KEY.format(post_id),
+        AUTHOR_CARDS_KEY.format(author_id),
+    ))
+
+
+def pages_generation():
+    generation, = get_versions(PAGES_GENERATION_KEY)
+    return generation
+
+
+def page_cache_key(request, scope_key):
+    generation, scope = get_versions(PAGES_GENERATION_KEY, scope_key)
+    url = hashlib.md5(
+        request.build_absolute_uri().encode(), usedforsecurity=False
+    ).hexdigest()
+    return PAGE_KEY.format(generation, scope, url)
+
+
+class AnonymousPageCacheMixin:
+    """Кэширует готовые ответы для анонимных GET-запросов.
+
+    Ключ включает общее поколение страниц и версию области страницы
+    (get_page_scope_key): комментарий сбрасывает только страницу своей
+    публикации, правка публикации — её страницу и ленты. Счётчики
+    комментариев в лентах обновляются с истечением кэша страницы.
+    """
+
+    page_cache_timeout = PAGE_CACHE_TIMEOUT
+
+    def get_page_scope_key(self):
+        return LISTS_GENERATION_KEY
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            response = super().dispatch(request, *args, **kwargs)
+        else:
+            key = page_cache_key(request, self.get_page_scope_key())
+            response = cache.get(key)
+            if response is not None:
+                # Валидаторы сохранены вместе со страницей: повторный
+                # запрос браузера получает 304 без обращения к базе.
+                response = get_conditional_response(
+                    request,
+                    etag=response.get('ETag'),
+                    last_modified=parse_http_date_safe(
+                        response.get('Last-Modified', '')
+                    ),
+                    response=response
+                )
+            else:
+                response = super().dispatch(request, *args, **kwargs)
+                if response.status_code == 200:
+                    response.add_post_render_callback(
+                        lambda rendered: self.store_page(key, rendered)
+                    )
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    def store_page(self, key, response):
+        # Страница с csrf-токеном или cookie не может быть общей.
+        if response.cookies or self.request.META.get(
+            'CSRF_COOKIE_NEEDS_UPDATE'
+        ):
+            return
+        cache.set(key, response, self.page_cache_timeout)
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 Not Modified, если страница не изменилась.
+
+    Представление задаёт get_last_modified() — время последнего
+    изменения данных страницы, полученное одним лёгким запросом.
+    ETag учитывает также пользователя, секрет csrf-токена на странице
+    и поколение страниц: правки авторов и местоположений не меняют
+    updated_at. Last-Modified отдаётся только анонимам — он не
+    различает пользователей.
+    """
+
+    def get_last_modified(self):
+        raise NotImplementedError
+
+    def get_etag(self, last_modified):
+        request = self.request
+        key = ':'.join(str(part) for part in (
+            request.get_full_path(),
+            request.user.pk,
+            # Секрет из cookie или выданный при рендере этой страницы.
+            request.META.get('CSRF_COOKIE', ''),
+            last_modified.isoformat(),
+            pages_generation(),
+        ))
+        return '"{}"'.format(
+            hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+        )
+
+    def set_validators(self, response, last_modified):
+        response.headers['ETag'] = self.get_etag(last_modified)
+        if not self.request.user.is_authenticated:
+            response.headers['Last-Modified'] = http_date(
+                int(last_modified.timestamp())
+            )
+        patch_vary_headers(response, ('Cookie',))
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        last_modified = self.get_last_modified()
+        if last_modified is None:
+            return super().dispatch(request, *args, **kwargs)
+        response = get_conditional_response(
+            request,
+            etag=self.get_etag(last_modified),
+            last_modified=(
+                None if request.user.is_authenticated
+                else int(last_modified.timestamp())
+            )
+        )
+        if response is not None:
+            self.set_validators(response, last_modified)
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            # Рендер может выдать новый csrf-секрет — ETag после него.
+            response.add_post_render_callback(
+                lambda rendered: self.set_validators(rendered, last_modified)
+            )
+        return response
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Сброс кэша сигналами доходит только до процесса, где был записан.
+
+    С несколькими процессами сервера (gunicorn --workers) остальные
+    отдают устаревшие страницы и карточки, пока те не истекут.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        'Кэш страниц и карточек блога хранится в памяти процесса.',
+        hint=(
+            'При нескольких процессах сервера задайте общий кэш: '
+            "BLOG_CACHE_BACKEND='redis' или 'file'."
+        ),
+        id='blog.W001',
+    )]
+
+
+@register()
+def check_search_stemmer(app_configs, **kwargs):
+    from . import search
+
+    backend = search.get_search_backend()
+    if getattr(backend, 'tokenizer', None) != 'unicode61' or (
+        search.snowballstemmer is not None
+    ):
+        return []
+    return [Warning(
+        'Пакет snowballstemmer не установлен: поиск не учитывает формы '
+        'слов.',
+        hint='Установите зависимости из requirements.txt.',
+        id='blog.W002',
+    )]
@@ -0,0 +1,141 @@
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from blog.cache import pages_generation
+from blog.models import Category, Post
+from blog.query_utils import get_posts, posts_last_modified
+from blogicum.settings import LIMIT_FEED
+
+User = get_user_model()
+
+
+class PostsFeed(Feed):
+    """Последние опубликованные публикации сайта."""
+
+    title = 'Блогикум'
+    description = subtitle = 'Новые публикации Блогикума'
+    # Поле публикации, связывающее её с объектом ленты, и условия на
+    # публикации по аргументам URL — для проверки без get_object().
+    owner_field = None
+    lookups = {}
+
+    def link(self, obj):
+        return reverse('blog:index')
+
+    def get_object(self, request, **kwargs):
+        return None
+
+    @classmethod
+    def last_modified(cls, **kwargs):
+        return posts_last_modified(Post.objects.filter(**{
+            cls.lookups[name]: value for name, value in kwargs.items()
+        }))
+
+    def items(self, obj):
+        posts = get_posts(projection='feed')
+        if self.owner_field:
+            posts = posts.filter(**{self.owner_field: obj})
+        return posts[:LIMIT_FEED]
+
+    def item_title(self, post):
+        return post.title
+
+    def item_description(self, post):
+        return post.text_html
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.updated_at
+
+    def item_author_name(self, post):
+        return post.author.username
+
+    def item_categories(self, post):
+        return (post.category.title,)
+
+
+class CategoryPostsFeed(PostsFeed):
+    owner_field = 'category'
+    lookups = {'category_slug': 'category__slug'}
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True
+        )
+
+    def title(self, category):
+        return f'Блогикум: {category.title}'
+
+    def description(self, category):
+        return category.description
+
+    subtitle = description
+
+    def link(self, category):
+        return reverse('blog:category_posts', args=[category.slug])
+
+
+class AuthorPostsFeed(PostsFeed):
+    owner_field = 'author'
+    lookups = {'username': 'author__username'}
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Блогикум: публикации @{author.username}'
+
+    def description(self, author):
+        return f'Новые публикации пользователя {author.username}'
+
+    subtitle = description
+
+    def link(self, author):
+        return reverse('blog:profile', args=[author.username])
+
+
+class AtomPostsFeed(PostsFeed):
+    feed_type = Atom1Feed
+
+
+class AtomCategoryPostsFeed(CategoryPostsFeed):
+    feed_type = Atom1Feed
+
+
+class AtomAuthorPostsFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+
+def conditional_feed(feed_class):
+    """Представление ленты с ответом 304 на неизменившуюся ленту.
+
+    Проверка стоит одного агрегатного запроса: ETag складывается из
+    времени последнего изменения публикаций ленты (см.
+    posts_last_modified) и поколения страниц, которое сбрасывается
+    и при правке авторов.
+    """
+
+    def last_modified(request, **kwargs):
+        # condition() спрашивает и ETag, и дату — считаем один раз.
+        if not hasattr(request, '_feed_latest'):
+            request._feed_latest = feed_class.last_modified(**kwargs)
+        return request._feed_latest
+
+    def etag(request, **kwargs):
+        latest = last_modified(request, **kwargs)
+        if latest is None:
+            return None
+        key = f'{request.path}:{latest.isoformat()}:{pages_generation()}'
+        return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+    return condition(
+        etag_func=etag, last_modified_func=last_modified
+    )(feed_class())
@@ -0,0 +1,181 @@
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import bump_card, bump_lists, bump_post_page
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_VARIANT_WORKERS,
+            thread_name_prefix='image-variants'
+        )
+    return _executor
+
+
+def read_image_metadata(file):
+    """Размер, хэш, формат и габариты файла за один проход."""
+    digest = hashlib.sha256()
+    size = 0
+    file.seek(0)
+    for chunk in file.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    file.seek(0)
+    with Image.open(file) as image:
+        width, height = image.size
+        image_format = image.format or ''
+    file.seek(0)
+    return {
+        'width': width,
+        'height': height,
+        'size': size,
+        'format': image_format,
+        'hash': digest.hexdigest(),
+    }
+
+
+def set_image_metadata(post):
+    post.image_meta = (
+        read_image_metadata(post.image.file) if post.image else {}
+    )
+
+
+def variant_name(name, width, fmt):
+    """Производные лежат рядом с оригиналом: posts/a.png.640w.webp."""
+    extension = 'jpg' if fmt == 'jpeg' else fmt
+    return f'{name}.{width}w.{extension}'
+
+
+def variant_urls(post, fmt):
+    """Варианты уже оригинала — шире него они не бывают."""
+    image = post.image
+    original_width = post.image_meta.get('width')
+    return [
+        (image.storage.url(variant_name(image.name, width, fmt)), width)
+        for width in settings.IMAGE_VARIANT_WIDTHS
+        if original_width is None or width < original_width
+    ]
+
+
+def render_variant(source, width, fmt):
+    variant = source.copy()
+    variant.thumbnail((width, width * 10), Image.Resampling.LANCZOS)
+    if fmt == 'jpeg' and variant.mode not in ('RGB', 'L'):
+        variant = variant.convert('RGB')
+    buffer = BytesIO()
+    variant.save(
+        buffer,
+        VARIANT_FORMATS[fmt][0],
+        quality=settings.IMAGE_VARIANT_QUALITY
+    )
+    return buffer.getvalue()
+
+
+def write_variants(name):
+    """Сохраняет недостающие варианты файла изображения.
+
+    Варианты не шире оригинала были бы его копиями, и variant_urls
+    на них не ссылается: ширина сравнивается так же, по файлу до
+    поворота по EXIF.
+    """
+    storage = Post._meta.get_field('image').storage
+    with storage.open(name) as file:
+        image = Image.open(file)
+        original_width = image.width
+        source = ImageOps.exif_transpose(image)
+        source.load()
+    for width in settings.IMAGE_VARIANT_WIDTHS:
+        if width >= original_width:
+            continue
+        for fmt in VARIANT_FORMATS:
+            target = variant_name(name, width, fmt)
+            # Имя оригинала задаётся содержимым, значит и готовый
+            # вариант с тем же именем совпадает с нужным.
+            if storage.exists(target):
+                continue
+            storage.save_derived(
+                target, ContentFile(render_variant(source, width, fmt))
+            )
+
+
+def generate_variants(post_id, name):
+    write_variants(name)
+    # Публикация могла сменить изображение, пока шла обработка.
+    Post.objects.filter(pk=post_id, image=name).update(
+        image_variants=True, updated_at=timezone.now()
+    )
+    bump_card(post_id)
+    bump_post_page(post_id)
+    bump_lists()
+
+
+def release_image(name):
+    """Удаляет файл и его варианты, если на него не осталось ссылок.
+
+    Файл моложе IMAGE_RELEASE_GRACE не трогаем: его могла только что
+    переиспользовать новая загрузка, чья запись ещё не закоммичена.
+    Такие файлы без ссылок позже убирает sweep_media.
+    """
+    if not name or Post.objects.filter(image=name).exists():
+        return
+    storage = Post._meta.get_field('image').storage
+    grace = timedelta(seconds=settings.IMAGE_RELEASE_GRACE)
+    with storage.lock():
+        if storage.exists(name) and (
+            storage.get_modified_time(name) > timezone.now() - grace
+        ):
+            return
+        for width in settings.IMAGE_VARIANT_WIDTHS:
+            for fmt in VARIANT_FORMATS:
+                storage.delete(variant_name(name, width, fmt))
+        storage.delete(name)
+
+
+def schedule_release(name):
+    transaction.on_commit(lambda: release_image(name))
+
+
+def _generate_in_worker(post_id, name):
+    close_old_connections()
+    try:
+        generate_variants(post_id, name)
+    except Exception:
+        logger.exception('Не удалось подготовить варианты %s', name)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(post):
+    """Готовит варианты изображения после коммита транзакции.
+
+    Если процесс завершится раньше или обработка упадёт, варианты
+    доделает команда generate_image_variants.
+    """
+    post_id, name = post.pk, post.image.name
+    if settings.IMAGE_VARIANTS_ASYNC:
+        transaction.on_commit(
+            lambda: get_executor().submit(_generate_in_worker, post_id, name)
+        )
+    else:
+        transaction.on_commit(lambda: generate_variants(post_id, name))
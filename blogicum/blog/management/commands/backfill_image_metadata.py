@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.cache import bump_card, bump_lists, bump_post_page
+from blog.images import read_image_metadata
+from blog.models import Post
+
+
+def read_stored_metadata(name):
+    storage = Post._meta.get_field('image').storage
+    try:
+        with storage.open(name) as file:
+            return read_image_metadata(file)
+    except (OSError, ValueError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет габариты, размер, формат и хэш изображений публикаций, '
+        'загруженных до появления этих полей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Сколько файлов читать параллельно.'
+        )
+
+    def handle(self, *args, **options):
+        pending = (
+            Post.objects
+            .exclude(image='')
+            .exclude(image__isnull=True)
+            .filter(image_meta__hash__isnull=True)
+            .order_by('id')
+            .values_list('id', 'image')
+        )
+        updated = missing = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                batch = list(
+                    pending.filter(id__gt=last_id)[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+                results = executor.map(
+                    read_stored_metadata, (name for _, name in batch)
+                )
+                changed = []
+                now = timezone.now()
+                for (post_id, _), metadata in zip(batch, results):
+                    if metadata is None:
+                        missing += 1
+                        continue
+                    changed.append(Post(
+                        id=post_id, image_meta=metadata, updated_at=now
+                    ))
+                Post.objects.bulk_update(
+                    changed, ['image_meta', 'updated_at']
+                )
+                updated += len(changed)
+                # Карточки и страницы кэшируются на сутки: без сброса
+                # картинки остались бы без width/height.
+                for post in changed:
+                    bump_card(post.id)
+                    bump_post_page(post.id)
+        if updated:
+            bump_lists()
+        self.stdout.write(
+            f'Обновлено публикаций: {updated}; '
+            f'файлы не найдены или повреждены: {missing}'
+        )
@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template import Template, Context
+from django.template.loader import get_template
+
+from blogicum.settings import LIMIT_POSTS
+
+# Прежний вариант шаблона: ссылка на каждую страницу.
+FULL_RANGE_TEMPLATE = Template(
+    '{% for i in page_obj.paginator.page_range %}'
+    '<a class="page-link" href="?page={{ i }}">{{ i }}</a>'
+    '{% endfor %}'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время и размер рендера пагинатора со ссылками на все '
+        'страницы и с «окном» страниц из includes/paginator.html.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            default=[1_000, 100_000, 1_000_000],
+            help='Число публикаций в ленте.'
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def measure(self, template, context, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            html = template.render(context)
+        return (time.perf_counter() - started) / repeat, len(html)
+
+    def handle(self, *args, **options):
+        windowed = get_template('includes/paginator.html')
+        for size in options['sizes']:
+            paginator = Paginator(range(size), LIMIT_POSTS)
+            page_obj = paginator.page(paginator.num_pages // 2 or 1)
+            full_time, full_size = self.measure(
+                FULL_RANGE_TEMPLATE,
+                Context({'page_obj': page_obj}),
+                options['repeat']
+            )
+            window_time, window_size = self.measure(
+                windowed, {'page_obj': page_obj}, options['repeat']
+            )
+            self.stdout.write(
+                f'{size} публикаций: все страницы — '
+                f'{full_time * 1000:.2f} мс, {full_size} байт; '
+                f'окно — {window_time * 1000:.2f} мс, {window_size} байт'
+            )
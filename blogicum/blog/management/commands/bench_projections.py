@@ -0,0 +1,90 @@
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from blog.models import Category, Location, Post
+from blog.query_utils import POST_PROJECTIONS, get_posts
+from blogicum.settings import LIMIT_POSTS
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время и пик памяти выборки лент с полными строками '
+        'и с проекциями get_posts(). Данные создаются во временной '
+        'транзакции и откатываются, кэш на время замера отключён.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument(
+            '--text-size',
+            type=int,
+            default=20_000,
+            help='Длина текста публикации и описания категории, символов.'
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def fill(self, posts, text_size):
+        text = ('слово ' * (text_size // 6 + 1))[:text_size]
+        # Всё откатится, поэтому существующие записи с теми же
+        # именами можно менять.
+        author, _ = User.objects.get_or_create(username='bench-projections')
+        category, _ = Category.objects.update_or_create(
+            slug='bench-projections',
+            defaults={'title': 'Замер', 'description': text},
+        )
+        location = Location.objects.create(name='Замер')
+        Post.objects.bulk_create(
+            Post(
+                title=f'Публикация {number}',
+                text=text,
+                excerpt=text[:60],
+                text_html=text,
+                pub_date=timezone.now(),
+                author=author,
+                category=category,
+                location=location,
+            )
+            for number in range(posts)
+        )
+
+    def measure(self, queryset, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset._chain())
+        elapsed = (time.perf_counter() - started) / repeat
+        tracemalloc.start()
+        list(queryset._chain())
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return elapsed, peak
+
+    # Сигналы сохранения категории и местоположения сбрасывают
+    # поколения кэша карточек и страниц — в настоящем кэше это
+    # обнулило бы его, хотя данные откатываются.
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }})
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.fill(options['posts'], options['text_size'])
+            for projection in (None, *POST_PROJECTIONS):
+                posts = get_posts(projection=projection)
+                for label, queryset in (
+                    ('страница', posts[:LIMIT_POSTS]),
+                    ('все строки', posts),
+                ):
+                    elapsed, peak = self.measure(queryset, options['repeat'])
+                    self.stdout.write(
+                        f'{projection or "все поля"}, {label}: '
+                        f'{elapsed * 1000:.2f} мс, '
+                        f'пик памяти {peak / 1024 / 1024:.2f} МБ'
+                    )
+            transaction.set_rollback(True)
@@ -0,0 +1,255 @@
+import itertools
+import json
+import time
+from collections import defaultdict
+
+from django.core import serializers
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.constants import OnConflict
+
+from blog.cache import bump_all_cards, bump_pages
+from blog.models import Post
+from blog.search import get_search_backend
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = ' \t\n\r'
+decoder = json.JSONDecoder()
+
+
+def batched(objects, size):
+    iterator = iter(objects)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+class ChunkedReader:
+    """Буфер над файлом: дочитывает его кусками по мере разбора."""
+
+    def __init__(self, stream, chunk_size):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.position = 0
+
+    def peek(self):
+        """Первый непробельный символ или '' в конце файла."""
+        while True:
+            buffer = self.buffer
+            while (
+                self.position < len(buffer)
+                and buffer[self.position] in WHITESPACE
+            ):
+                self.position += 1
+            if self.position < len(buffer):
+                return buffer[self.position]
+            self.buffer, self.position = self.stream.read(self.chunk_size), 0
+            if not self.buffer:
+                return ''
+
+    def decode(self):
+        while True:
+            try:
+                item, self.position = decoder.raw_decode(
+                    self.buffer, self.position
+                )
+                return item
+            except json.JSONDecodeError:
+                # Объект оборвался на границе куска — дочитываем.
+                chunk = self.stream.read(self.chunk_size)
+                if not chunk:
+                    raise DeserializationError('Файл обрывается.')
+                self.buffer = self.buffer[self.position:] + chunk
+                self.position = 0
+
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE):
+    """Объекты JSON-массива по одному: файл читается кусками.
+
+    В памяти держится только текущий кусок, а не весь массив, как у
+    json.load(). Элементы массива должны быть объектами — как в
+    фикстурах dumpdata: незаконченный объект не спутать с целым.
+    """
+    reader = ChunkedReader(stream, chunk_size)
+    if reader.peek() != '[':
+        raise DeserializationError('Ожидался JSON-массив.')
+    reader.position += 1
+    separator = ']' if reader.peek() == ']' else ','
+    while separator == ',':
+        if reader.peek() != '{':
+            raise DeserializationError(
+                'Элементы массива должны быть JSON-объектами.'
+            )
+        yield reader.decode()
+        separator = reader.peek()
+        if separator not in (',', ']'):
+            raise DeserializationError(
+                f'Ожидалась запятая или «]», найдено: {separator!r}.'
+            )
+        reader.position += 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает JSON-фикстуру формата dumpdata (например, '
+        'db.json): читает файл потоком и вставляет объекты пачками в '
+        'одной транзакции, без save() и сигналов. Существующие объекты '
+        'с теми же id перезаписываются, как при loaddata.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Путь к JSON-файлу.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options['database']
+        connection = connections[using]
+        started = time.monotonic()
+
+        # Как в seed_blog: индекс дешевле перестроить после загрузки,
+        # чем обновлять триггером на каждую строку.
+        backend = get_search_backend()
+        with connection.schema_editor() as schema_editor:
+            backend.uninstall(schema_editor)
+        try:
+            with (
+                open(options['fixture'], encoding='utf-8') as stream,
+                transaction.atomic(using=using),
+            ):
+                # Объекты идут в порядке файла, ссылки вперёд допустимы:
+                # внешние ключи проверяются разом перед коммитом.
+                with connection.constraint_checks_disabled():
+                    counts = self.load(
+                        stream, using, options['batch_size']
+                    )
+                connection.check_constraints(table_names=[
+                    model._meta.db_table for model in counts
+                ])
+                self.reset_sequences(connection, list(counts))
+        except (OSError, DeserializationError) as error:
+            raise CommandError(f'{options["fixture"]}: {error}')
+        finally:
+            with connection.schema_editor() as schema_editor:
+                backend.install(schema_editor)
+
+        for model, count in counts.items():
+            self.stdout.write(f'{model._meta.label}: {count}')
+        call_command('recount_comments', stdout=self.stdout)
+        bump_all_cards()
+        bump_pages()
+        self.stdout.write(
+            f'Загружено объектов: {sum(counts.values())} за '
+            f'{time.monotonic() - started:.1f} с'
+        )
+
+    def load(self, stream, using, batch_size):
+        """Вставляет объекты, накапливая по batch_size на модель."""
+        counts = defaultdict(int)
+        pending = defaultdict(list)
+        deferred = []
+        objects = serializers.deserialize(
+            'python',
+            iter_json_array(stream),
+            using=using,
+            handle_forward_references=True,
+        )
+        for obj in objects:
+            model = type(obj.object)
+            pending[model].append(obj)
+            if obj.deferred_fields:
+                deferred.append(obj)
+            if len(pending[model]) >= batch_size:
+                counts[model] += self.insert(model, pending.pop(model), using)
+        for model, batch in pending.items():
+            counts[model] += self.insert(model, batch, using)
+        # Ссылки вперёд по естественным ключам: объекты уже в базе.
+        for obj in deferred:
+            obj.save_deferred_fields(using=using)
+        return counts
+
+    def insert(self, model, batch, using):
+        """Сырая вставка пачки с перезаписью объектов с тем же id.
+
+        Вставка сырая, как у save(raw=True) в loaddata: bulk_create()
+        затёр бы auto_now_add-даты из фикстуры текущим временем.
+        """
+        connection = connections[using]
+        opts = model._meta
+        fields = [
+            field for field in opts.local_concrete_fields
+            if not field.generated
+        ]
+        timestamps = [
+            field for field in fields
+            if getattr(field, 'auto_now', False)
+            or getattr(field, 'auto_now_add', False)
+        ]
+        instances = []
+        for obj in batch:
+            instance = obj.object
+            # Поля, которых не было при выгрузке, заполняются сейчас.
+            for field in timestamps:
+                if getattr(instance, field.attname) is None:
+                    field.pre_save(instance, add=True)
+            if model is Post:
+                # pre_save не вызывается — производный текст считаем сами.
+                instance.render_text()
+            if instance.pk is None:
+                # Без id не построить связи многие-ко-многим: редкий
+                # случай, обычное сохранение.
+                obj.save(using=using)
+            else:
+                instances.append(instance)
+
+        update_fields = [field for field in fields if not field.primary_key]
+        options = {}
+        if update_fields and connection.features.supports_update_conflicts:
+            options = {
+                'on_conflict': OnConflict.UPDATE,
+                'update_fields': update_fields,
+            }
+            if connection.features.supports_update_conflicts_with_target:
+                options['unique_fields'] = [opts.pk]
+        manager = model._base_manager.using(using)
+        size = connection.ops.bulk_batch_size(fields, instances)
+        for chunk in batched(instances, max(size, 1)):
+            manager._insert(chunk, fields, using=using, raw=True, **options)
+        self.insert_m2m(opts, batch, using)
+        return len(batch)
+
+    def insert_m2m(self, opts, batch, using):
+        """Связи многие-ко-многим заменяют прежние, как при loaddata."""
+        for field in opts.many_to_many:
+            through = field.remote_field.through
+            if not through._meta.auto_created:
+                # Явная промежуточная модель выгружается отдельно.
+                continue
+            source = through._meta.get_field(field.m2m_field_name()).attname
+            target = through._meta.get_field(
+                field.m2m_reverse_field_name()
+            ).attname
+            owners = [
+                obj for obj in batch
+                if obj.object.pk is not None and field.name in obj.m2m_data
+            ]
+            if not owners:
+                continue
+            manager = through._base_manager.using(using)
+            manager.filter(**{
+                f'{source}__in': [obj.object.pk for obj in owners]
+            }).delete()
+            manager.bulk_create(
+                through(**{source: obj.object.pk, target: pk})
+                for obj in owners
+                for pk in obj.m2m_data[field.name]
+            )
+
+    def reset_sequences(self, connection, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
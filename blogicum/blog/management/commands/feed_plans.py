@@ -0,0 +1,98 @@
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+
+from blog.models import Category, Comment, Post
+from blog.query_utils import get_posts
+from blogicum.settings import LIMIT_POSTS
+
+User = get_user_model()
+
+# Схема до 0005_feed_indexes: обычные индексы внешних ключей вместо
+# составных индексов лент.
+FK_INDEXES = ((Post, 'author'), (Post, 'category'), (Comment, 'post'))
+
+
+@contextmanager
+def without_feed_indexes():
+    """Схема без индексов лент в транзакции, которая откатывается.
+
+    Откат миграций для сравнения не годится: старая схема не знает
+    полей, добавленных позже, и запросы лент на ней падают.
+    """
+    with transaction.atomic():
+        # Редактор схемы нужен только для генерации SQL: войти в него
+        # внутри транзакции SQLite не позволяет.
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model in (Post, Comment):
+                for index in model._meta.indexes:
+                    cursor.execute(editor.sql_delete_index % {
+                        'table': editor.quote_name(model._meta.db_table),
+                        'name': editor.quote_name(index.name),
+                    })
+            for model, field in FK_INDEXES:
+                index = models.Index(
+                    fields=[field],
+                    name=f'{model._meta.db_table}_{field}_plain',
+                )
+                cursor.execute(str(index.create_sql(model, editor)))
+        yield
+        transaction.set_rollback(True)
+
+
+class Command(BaseCommand):
+    help = (
+        'Печатает планы и время горячих запросов лент: сначала без '
+        'индексов лент (схема меняется в откатываемой транзакции), '
+        'затем с ними.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Сколько раз выполнить каждый запрос для замера времени.'
+        )
+
+    def get_queries(self):
+        queries = {'index': get_posts(projection='card')[:LIMIT_POSTS]}
+        category = Category.objects.filter(is_published=True).first()
+        if category:
+            queries['category'] = get_posts(projection='card').filter(
+                category=category
+            )[:LIMIT_POSTS]
+        author = User.objects.filter(posts__isnull=False).first()
+        if author:
+            queries['profile'] = get_posts(
+                manager=author.posts, only_published=False,
+                projection='card'
+            )[:LIMIT_POSTS]
+        post = Post.objects.filter(comments__isnull=False).first()
+        if post:
+            queries['comments'] = Comment.objects.filter(
+                post=post
+            ).select_related('author')[:LIMIT_POSTS]
+        return queries
+
+    def report(self, title, queries, repeat):
+        self.stdout.write(self.style.SUCCESS(f'== {title} =='))
+        for name, queryset in queries.items():
+            started = time.perf_counter()
+            for _ in range(repeat):
+                list(queryset._chain())
+            elapsed = (time.perf_counter() - started) / repeat
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{name}: {elapsed * 1000:.2f} мс на запрос'
+            ))
+            self.stdout.write(queryset.explain())
+
+    def handle(self, *args, **options):
+        queries = self.get_queries()
+        with without_feed_indexes():
+            self.report('без индексов лент', queries, options['repeat'])
+        self.report('с индексами лент', queries, options['repeat'])
@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.cache import bump_card, bump_lists, bump_post_page
+from blog.images import write_variants
+from blog.models import Post
+
+
+def try_write_variants(name):
+    try:
+        write_variants(name)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+class Command(BaseCommand):
+    help = (
+        'Готовит варианты изображений публикаций, у которых их нет: '
+        'фоновая обработка после загрузки прервалась или упала.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Сколько изображений обрабатывать параллельно.'
+        )
+
+    def handle(self, *args, **options):
+        pending = (
+            Post.objects
+            .exclude(image='')
+            .exclude(image__isnull=True)
+            .filter(image_variants=False)
+            .order_by('id')
+            .values_list('id', 'image')
+        )
+        updated = failed = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                batch = list(
+                    pending.filter(id__gt=last_id)[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+                # Потоки только пишут файлы, база — в основном потоке.
+                results = executor.map(
+                    try_write_variants, (name for _, name in batch)
+                )
+                done = []
+                for (post_id, name), success in zip(batch, results):
+                    if success:
+                        done.append((post_id, name))
+                    else:
+                        failed += 1
+                # Одинаковые файлы хранятся один раз, так что
+                # публикации с любым из готовых имён уже с вариантами.
+                updated += Post.objects.filter(
+                    pk__in=[post_id for post_id, _ in done],
+                    image__in=[name for _, name in done],
+                ).update(image_variants=True, updated_at=timezone.now())
+                for post_id, _ in done:
+                    bump_card(post_id)
+                    bump_post_page(post_id)
+        if updated:
+            bump_lists()
+        self.stdout.write(
+            f'Готовы варианты публикаций: {updated}; '
+            f'файлы не найдены или повреждены: {failed}'
+        )
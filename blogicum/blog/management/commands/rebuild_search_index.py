@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересоздаёт поисковый индекс публикаций, например после смены '
+        'SEARCH_TOKENIZER.'
+    )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with connection.schema_editor() as editor:
+            backend.uninstall(editor)
+            backend.install(editor)
+        self.stdout.write('Поисковый индекс пересоздан.')
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog.cache import bump_all_cards, bump_pages
+from blog.models import Post
+from blog.query_utils import actual_comment_count
+
+
+class Command(BaseCommand):
+    help = 'Сверяет Post.comment_count с фактическим числом комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать число расхождений, ничего не меняя.'
+        )
+
+    def handle(self, *args, **options):
+        actual = actual_comment_count()
+        with transaction.atomic():
+            drifted = Post.objects.exclude(comment_count=actual)
+            if options['dry_run']:
+                fixed = drifted.count()
+            else:
+                fixed = drifted.update(
+                    comment_count=actual, updated_at=timezone.now()
+                )
+        if fixed and not options['dry_run']:
+            # Какие публикации исправлены, неизвестно: счётчики видны
+            # в карточках всех лент.
+            bump_all_cards()
+            bump_pages()
+        self.stdout.write(f'Публикаций с расхождением счётчика: {fixed}')
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.cache import bump_all_cards, bump_pages
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново вычисляет начало текста и HTML публикаций: после смены '
+        'правил разметки или правки текста в обход save().'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        posts = Post.objects.order_by('id').only('id', 'text')
+        updated = 0
+        last_id = 0
+        while True:
+            batch = list(
+                posts.filter(id__gt=last_id)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            now = timezone.now()
+            for post in batch:
+                post.render_text()
+                post.updated_at = now
+            Post.objects.bulk_update(
+                batch, ['excerpt', 'text_html', 'updated_at']
+            )
+            updated += len(batch)
+        bump_all_cards()
+        bump_pages()
+        self.stdout.write(f'Обновлено публикаций: {updated}')
@@ -0,0 +1,190 @@
+import itertools
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from blog.cache import bump_all_cards, bump_pages
+from blog.models import Category, Comment, Location, Post
+from blog.search import get_search_backend
+
+User = get_user_model()
+
+WORDS = (
+    'город утро дорога поезд море берег лес дождь солнце ветер река '
+    'мост площадь улица окно книга письмо друг встреча праздник кофе '
+    'рынок музей парк вечер ночь звезда гора снег лето осень весна '
+    'зима путешествие история фотография прогулка разговор новость '
+    'работа дом сад кухня рецепт музыка концерт фильм театр поход'
+).split()
+
+
+def batched(objects, size):
+    iterator = iter(objects)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def zipf_weights(count, exponent):
+    """Накопленные веса распределения Ципфа: первые — «горячие»."""
+    return list(itertools.accumulate(
+        1 / (rank ** exponent) for rank in range(1, count + 1)
+    ))
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, категориями, '
+        'местами, публикациями и комментариями для нагрузочных '
+        'замеров. Одинаковый --seed даёт одинаковые данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument('--comments', type=int, default=50_000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--prefix',
+            default='seed',
+            help='Префикс имён пользователей и slug категорий.'
+        )
+        parser.add_argument(
+            '--future-share',
+            type=float,
+            default=0.05,
+            help='Доля отложенных публикаций (pub_date в будущем).'
+        )
+        parser.add_argument(
+            '--hidden-share',
+            type=float,
+            default=0.1,
+            help='Доля снятых с публикации категорий и публикаций.'
+        )
+
+    def insert(self, model, objects, batch_size):
+        """Вставляет объекты пачками и возвращает их id."""
+        ids = []
+        started = time.monotonic()
+        for batch in batched(objects, batch_size):
+            with transaction.atomic():
+                created = model.objects.bulk_create(batch)
+            ids.extend(obj.pk for obj in created)
+        self.stdout.write(
+            f'{model._meta.verbose_name_plural}: {len(ids)} за '
+            f'{time.monotonic() - started:.1f} с'
+        )
+        return ids
+
+    def text(self, rng):
+        words = rng.choices(WORDS, k=rng.randint(20, 300))
+        for position in range(40, len(words), rng.randint(40, 80)):
+            words[position] += '\n'
+        return ' '.join(words).capitalize()
+
+    def generate_users(self, rng, options):
+        # Хэш пароля считается один раз: PBKDF2 на каждого — часы.
+        password = make_password('password')
+        prefix = options['prefix']
+        for number in range(options['users']):
+            yield User(
+                username=f'{prefix}-user-{number}',
+                first_name=rng.choice(WORDS).capitalize(),
+                password=password,
+                date_joined=self.now - timedelta(days=rng.randint(0, 2000)),
+            )
+
+    def generate_categories(self, rng, options):
+        prefix = options['prefix']
+        for number in range(options['categories']):
+            yield Category(
+                title=f'{rng.choice(WORDS).capitalize()} {number}',
+                description=self.text(rng),
+                slug=f'{prefix}-{number}',
+                is_published=rng.random() >= options['hidden_share'],
+            )
+
+    def generate_locations(self, rng, options):
+        for number in range(options['locations']):
+            yield Location(name=f'{rng.choice(WORDS).capitalize()} {number}')
+
+    def generate_posts(self, rng, options, users, categories, locations):
+        author_weights = zipf_weights(len(users), 1.1)
+        for number in range(options['posts']):
+            if rng.random() < options['future_share']:
+                pub_date = self.now + timedelta(minutes=rng.randint(1, 10**5))
+            else:
+                pub_date = self.now - timedelta(minutes=rng.randint(0, 10**7))
+            post = Post(
+                title=' '.join(rng.choices(WORDS, k=4)).capitalize(),
+                text=self.text(rng),
+                pub_date=pub_date,
+                is_published=rng.random() >= options['hidden_share'] / 2,
+                author_id=rng.choices(users, cum_weights=author_weights)[0],
+                category_id=rng.choice(categories),
+                location_id=(
+                    rng.choice(locations) if rng.random() < 0.7 else None
+                ),
+            )
+            post.render_text()
+            yield post
+
+    def generate_comments(self, rng, options, users, posts):
+        # «Вирусные» публикации собирают большую часть комментариев.
+        post_weights = zipf_weights(len(posts), 1.2)
+        order = list(posts)
+        rng.shuffle(order)
+        for _ in range(options['comments']):
+            yield Comment(
+                text=' '.join(rng.choices(WORDS, k=rng.randint(3, 40))),
+                post_id=rng.choices(order, cum_weights=post_weights)[0],
+                author_id=rng.choice(users),
+            )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        # Отсчёт от начала суток — повторный запуск в тот же день даёт
+        # те же даты.
+        self.now = timezone.now().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        batch_size = options['batch_size']
+        started = time.monotonic()
+
+        # Поисковый индекс быстрее перестроить целиком, чем обновлять
+        # триггером на каждую вставленную строку.
+        backend = get_search_backend()
+        with connection.schema_editor() as schema_editor:
+            backend.uninstall(schema_editor)
+        try:
+            users = self.insert(
+                User, self.generate_users(rng, options), batch_size
+            )
+            categories = self.insert(
+                Category, self.generate_categories(rng, options), batch_size
+            )
+            locations = self.insert(
+                Location, self.generate_locations(rng, options), batch_size
+            )
+            posts = self.insert(Post, self.generate_posts(
+                rng, options, users, categories, locations
+            ), batch_size)
+            self.insert(Comment, self.generate_comments(
+                rng, options, users, posts
+            ), batch_size)
+            call_command('recount_comments', stdout=self.stdout)
+        finally:
+            with connection.schema_editor() as schema_editor:
+                backend.install(schema_editor)
+        bump_all_cards()
+        bump_pages()
+        self.stdout.write(f'Готово за {time.monotonic() - started:.1f} с')
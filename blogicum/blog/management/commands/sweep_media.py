@@ -0,0 +1,143 @@
+import os
+import re
+import shutil
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models.functions import Collate
+
+from blog.models import Post
+
+VARIANT_RE = re.compile(r'^(?P<source>.+)\.\d+w\.(?:webp|jpg)$')
+
+
+def source_name(name):
+    """Оригинал, к которому относится файл варианта."""
+    match = VARIANT_RE.match(name)
+    return match['source'] if match else name
+
+
+def walk_sorted(root, prefix):
+    """Файлы каталога по возрастанию имени оригинала.
+
+    Подкаталог сортируется по ключу «путь/»: все его файлы начинаются
+    с этого префикса и идут одним отрезком, поэтому рекурсивный обход
+    даёт глобально отсортированный поток, держа в памяти один каталог.
+    """
+    entries = []
+    with os.scandir(root) as scanner:
+        for entry in scanner:
+            name = f'{prefix}{entry.name}'
+            if entry.is_dir(follow_symlinks=False):
+                entries.append((f'{name}/', name, entry))
+            else:
+                entries.append((source_name(name), name, entry))
+    entries.sort(key=lambda item: (item[0], item[1]))
+    for key, name, entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from walk_sorted(entry.path, f'{name}/')
+        else:
+            yield key, name, entry
+
+
+class Command(BaseCommand):
+    help = (
+        'Находит файлы в каталоге изображений публикаций, на которые не '
+        'ссылается ни одна публикация, и удаляет или переносит их.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только вывести найденные файлы.'
+        )
+        parser.add_argument(
+            '--quarantine',
+            help='Переносить файлы в этот каталог вместо удаления.'
+        )
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=3600,
+            help=(
+                'Не трогать файлы моложе стольких секунд: запись о '
+                'публикации сохраняется позже файла.'
+            )
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def referenced_names(self, batch_size):
+        image = Collate('image', 'C') if (
+            connection.vendor == 'postgresql'
+        ) else 'image'
+        return (
+            Post.objects
+            .exclude(image='')
+            .exclude(image__isnull=True)
+            .order_by(image)
+            .values_list('image', flat=True)
+            .distinct()
+            .iterator(chunk_size=batch_size)
+        )
+
+    def remove(self, storage, name, cutoff, quarantine):
+        """Удаляет или переносит файл, если он всё ещё старый.
+
+        Проверка повторяется под блокировкой хранилища: повторная
+        загрузка того же файла могла обновить его mtime после обхода.
+        """
+        path = storage.path(name)
+        with storage.lock():
+            try:
+                if os.stat(path).st_mtime > cutoff:
+                    return False
+            except FileNotFoundError:
+                return False
+            if quarantine:
+                target = os.path.join(quarantine, name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(path, target)
+            else:
+                os.remove(path)
+            storage.remove_empty_dirs(name)
+        return True
+
+    def handle(self, *args, **options):
+        storage = Post._meta.get_field('image').storage
+        upload_to = Post._meta.get_field('image').upload_to
+        root = storage.path(upload_to)
+        if not os.path.isdir(root):
+            return
+
+        started = time.monotonic()
+        cutoff = time.time() - options['min_age']
+        scanned = orphans = freed = 0
+        referenced = self.referenced_names(options['batch_size'])
+        current = next(referenced, None)
+
+        for key, name, entry in walk_sorted(root, upload_to):
+            scanned += 1
+            while current is not None and current < key:
+                current = next(referenced, None)
+            if key == current:
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime > cutoff:
+                continue
+            if not options['dry_run'] and not self.remove(
+                storage, name, cutoff, options['quarantine']
+            ):
+                continue
+            orphans += 1
+            freed += stat.st_size
+            if options['verbosity'] > 1 or options['dry_run']:
+                self.stdout.write(name)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'Просмотрено файлов: {scanned}; без ссылок: {orphans} '
+            f'({freed / 1024 / 1024:.1f} МБ); '
+            f'{elapsed:.1f} с, {scanned / max(elapsed, 1e-9):.0f} файлов/с'
+        )
@@ -0,0 +1,136 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from .nplusone import NPlusOneError, QueryShapeCounter
+
+logger = logging.getLogger('blog.timing')
+nplusone_logger = logging.getLogger('blog.nplusone')
+
+
+@contextmanager
+def execute_wrappers(*wrappers):
+    """Подключает обёртки запросов ко всем соединениям с базой."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            for wrapper in wrappers:
+                stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+class QueryTimer:
+    """Обёртка execute_wrapper: число запросов и их суммарное время."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+class ServerTimingMiddleware:
+    """Замеряет SQL, представление и рендер шаблона для доли запросов.
+
+    Доля задаётся SERVER_TIMING_SAMPLE_RATE; остальные запросы идут
+    без обёрток. Результат — заголовок Server-Timing и строка JSON в
+    логгере blog.timing. Запросы потоковых ответов, выполняемые уже
+    после выхода из middleware, не учитываются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+        timer = QueryTimer()
+        marks = request._timing_marks = {}
+        started = time.perf_counter()
+        with execute_wrappers(timer):
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        view_started = marks.get('view_started', started)
+        view_done = marks.get('view_done')
+        rendered = marks.get('rendered', view_done)
+        if view_done is None:
+            view_done = rendered = started + total
+        metrics = {
+            'db': (timer.duration, f'{timer.count} queries'),
+            'view': (view_done - view_started, None),
+            'render': (rendered - view_done, None),
+            'total': (total, None),
+        }
+        response.headers['Server-Timing'] = ', '.join(
+            f'{name};dur={duration * 1000:.1f}'
+            + (f';desc="{description}"' if description else '')
+            for name, (duration, description) in metrics.items()
+        )
+        match = request.resolver_match
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': timer.count,
+            **{
+                f'{name}_ms': round(duration * 1000, 1)
+                for name, (duration, _) in metrics.items()
+            },
+        }))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        marks = getattr(request, '_timing_marks', None)
+        if marks is not None:
+            marks['view_started'] = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        marks = getattr(request, '_timing_marks', None)
+        if marks is not None:
+            marks['view_done'] = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: marks.update(rendered=time.perf_counter())
+            )
+        return response
+
+
+class NPlusOneMiddleware:
+    """Находит запросы одной формы, повторённые в запросе много раз.
+
+    Больше NPLUSONE_THRESHOLD повторов — почти всегда обращение к
+    связанному объекту в цикле шаблона без select_related или
+    prefetch_related. С NPLUSONE_RAISE (в тестах) вызывает
+    NPlusOneError, иначе пишет предупреждение в логгер blog.nplusone.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        threshold = settings.NPLUSONE_THRESHOLD
+        if threshold is None:
+            return self.get_response(request)
+        counter = QueryShapeCounter()
+        with execute_wrappers(counter):
+            response = self.get_response(request)
+        repeated = counter.repeated(threshold)
+        if repeated:
+            message = f'{request.method} {request.path}: ' + '; '.join(
+                f'{count}× {shape}' for shape, count in repeated
+            )
+            if settings.NPLUSONE_RAISE:
+                raise NPlusOneError(message)
+            nplusone_logger.warning(message)
+        return response
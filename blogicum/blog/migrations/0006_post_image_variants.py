@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_variants',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Варианты изображения готовы'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_meta',
+            field=models.JSONField(default=dict, editable=False, verbose_name='Сведения об изображении'),
+        ),
+    ]
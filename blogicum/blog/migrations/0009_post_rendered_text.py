@@ -0,0 +1,52 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:21
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+BATCH_SIZE = 500
+
+
+# Правила разметки на момент миграции: не зависят от blog.models.
+def make_excerpt(text):
+    return Truncator(Truncator(text).words(10, truncate=' …')).chars(1024)
+
+
+def render_text_html(text):
+    return linebreaksbr(text, autoescape=True)
+
+
+def render_texts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.order_by('id').only('id', 'text')
+    last_id = 0
+    while True:
+        batch = list(posts.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        for post in batch:
+            post.excerpt = make_excerpt(post.text)
+            post.text_html = render_text_html(post.text)
+        Post.objects.bulk_update(batch, ['excerpt', 'text_html'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=1024, verbose_name='Начало текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(render_texts, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,26 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.template.defaultfilters import linebreaksbr
 from django.urls import reverse
+from django.utils.text import Truncator
+
+from .storage import ContentAddressedStorage
 
 User = get_user_model()
 MAX_LENGTH = 256
+EXCERPT_WORDS = 10
+EXCERPT_MAX_LENGTH = 1024
+
+
+def make_excerpt(text):
+    # То же, что фильтр truncatewords, плюс предел длины для CharField.
+    return Truncator(
+        Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    ).chars(EXCERPT_MAX_LENGTH)
+
+
+def render_text_html(text):
+    return linebreaksbr(text, autoescape=True)
 
 
 class PublishedCreatedModel(models.Model):
@@ -43,6 +60,9 @@ class Category(PublishedCreatedModel):
             'разрешены символы латиницы, цифры, дефис и подчёркивание.'
         )
     )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name='Изменено'
+    )
 
     class Meta:
         verbose_name = 'категория'
@@ -56,6 +76,17 @@ class Category(PublishedCreatedModel):
 class Post(PublishedCreatedModel):
     title = models.CharField(max_length=MAX_LENGTH, verbose_name='Заголовок')
     text = models.TextField(verbose_name='Текст')
+    excerpt = models.CharField(
+        max_length=EXCERPT_MAX_LENGTH,
+        blank=True,
+        editable=False,
+        verbose_name='Начало текста'
+    )
+    text_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='Текст в HTML'
+    )
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
         help_text=(
@@ -66,6 +97,7 @@ class Post(PublishedCreatedModel):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Автор публикации',
     )
     location = models.ForeignKey(
@@ -79,20 +111,62 @@ class Post(PublishedCreatedModel):
         Category,
         on_delete=models.SET_NULL,
         null=True,
+        db_index=False,
         verbose_name='Категория',
     )
     image = models.ImageField(
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True,
         null=True,
         verbose_name='Изображение'
     )
+    # Ширина, высота, размер, формат и SHA-256 файла; заполняются при
+    # загрузке, чтобы не открывать файл во время рендера.
+    image_meta = models.JSONField(
+        default=dict,
+        editable=False,
+        verbose_name='Сведения об изображении'
+    )
+    image_variants = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Варианты изображения готовы'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    # Меняется и при изменении комментариев: страница публикации
+    # включает их, а валидаторы HTTP-кэша смотрят только на публикацию.
+    updated_at = models.DateTimeField(
+        auto_now=True, db_index=True, verbose_name='Изменено'
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ('-pub_date',)
+        # Индексы по предикатам лент из get_posts(): общая лента
+        # (частичный, только опубликованные), лента автора и категории.
+        # Ведущий столбец составных индексов заменяет индексы FK.
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_feed_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='post_category_feed_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title[:21]
@@ -102,12 +176,41 @@ class Post(PublishedCreatedModel):
             'blog:post_detail', args=[self.pk]
         )
 
+    def render_text(self):
+        self.excerpt = make_excerpt(self.text)
+        self.text_html = render_text_html(self.text)
+
+
+class PostSearchEntry(models.Model):
+    """Строка FTS5-индекса публикаций в SQLite (см. blog.search).
+
+    Таблицу создаёт поисковый бэкенд, а не миграции; модель нужна,
+    чтобы присоединять индекс к запросам публикаций.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_entry',
+    )
+    # Скрытый столбец FTS5 с именем таблицы: левая часть MATCH
+    # (лукап match из blog.search) и первый аргумент bm25().
+    document = models.TextField(db_column='blog_post_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_fts'
+
 
 class Comment(models.Model):
     text = models.TextField('Текст комментария')
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Публикация'
     )
     created_at = models.DateTimeField(
@@ -123,6 +226,12 @@ class Comment(models.Model):
     class Meta:
         ordering = ('created_at',)
         default_related_name = 'comments'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx',
+            ),
+        )
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
 
@@ -0,0 +1,40 @@
+import re
+from collections import Counter
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+SPACE_RE = re.compile(r'\s+')
+
+
+class NPlusOneError(Exception):
+    """Запрос одной формы выполнен для каждой строки выборки."""
+
+
+def normalize_sql(sql):
+    """Форма запроса: без литералов, длины IN-списков и пробелов.
+
+    Параметры Django передаёт отдельно, но LIMIT/OFFSET и число
+    заполнителей в IN (...) попадают в текст запроса.
+    """
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = IN_LIST_RE.sub('(...)', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+class QueryShapeCounter:
+    """Обёртка execute_wrapper: сколько раз выполнена каждая форма."""
+
+    def __init__(self):
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.shapes[normalize_sql(sql)] += 1
+        return execute(sql, params, many, context)
+
+    def repeated(self, threshold):
+        return [
+            (shape, count) for shape, count in self.shapes.most_common()
+            if count > threshold
+        ]
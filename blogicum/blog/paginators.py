@@ -0,0 +1,141 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.http import Http404
+
+
+class InvalidCursor(Http404):
+    pass
+
+
+class CursorPage:
+    cursor_based = True
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация по набору полей сортировки.
+
+    Страница выбирается условием «после/до последней строки
+    предыдущей страницы», поэтому любая страница стоит как первая:
+    нет ни OFFSET, ни COUNT(*). Последнее поле сортировки должно
+    быть уникальным (обычно ``id``).
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = per_page
+        self.ordering = ordering
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip('-'))
+            for name in ordering
+        ]
+
+    def encode_cursor(self, obj, direction):
+        values = [
+            field.value_to_string(obj) for field in self.fields
+        ]
+        raw = json.dumps([direction, *values]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, *values = json.loads(raw)
+            if direction not in ('n', 'p') or (
+                len(values) != len(self.fields)
+            ):
+                raise ValueError
+            values = [
+                field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except Exception:
+            raise InvalidCursor('Некорректный курсор страницы.')
+        return direction, values
+
+    def _keyset_filter(self, values, reverse):
+        condition = Q()
+        equal = {}
+        for name, value in zip(self.ordering, values):
+            descending = name.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            field_name = name.lstrip('-')
+            condition |= Q(**equal, **{f'{field_name}__{lookup}': value})
+            equal[field_name] = value
+        return condition
+
+    def page(self, cursor=None):
+        if not cursor:
+            return self._forward_page(self.queryset, first=True)
+
+        direction, values = self.decode_cursor(cursor)
+        if direction == 'n':
+            return self._forward_page(
+                self.queryset.filter(self._keyset_filter(values, False)),
+                first=False
+            )
+
+        reverse_ordering = [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        ]
+        rows = list(
+            self.queryset
+            .filter(self._keyset_filter(values, True))
+            .order_by(*reverse_ordering)[:self.per_page + 1]
+        )
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        return CursorPage(
+            rows,
+            self,
+            next_cursor=self.encode_cursor(rows[-1], 'n') if rows else None,
+            previous_cursor=(
+                self.encode_cursor(rows[0], 'p') if has_previous else None
+            ),
+        )
+
+    def _forward_page(self, queryset, first):
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return CursorPage(
+            rows,
+            self,
+            next_cursor=(
+                self.encode_cursor(rows[-1], 'n') if has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(rows[0], 'p') if rows and not first
+                else None
+            ),
+        )
@@ -1,37 +1,167 @@
+from functools import wraps
+
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.shortcuts import redirect
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from django.db.models import Count
 
-from blog.models import Post
+from blog.models import Comment, Post
+from blog.paginators import CursorPaginator
+from blogicum.settings import CURSOR_PAGINATION, LIMIT_COMMENTS
+
+
+def request_cached(method):
+    """Запоминает результат метода представления на время запроса.
+
+    Экземпляр CBV создаётся заново на каждый запрос, поэтому результат
+    достаточно хранить в самом экземпляре. Вызовы с аргументами
+    (например, get_object(queryset)) не кэшируются.
+    """
+    attr_name = f'_cached_{method.__name__}'
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if any(arg is not None for arg in (*args, *kwargs.values())):
+            return method(self, *args, **kwargs)
+        if attr_name not in self.__dict__:
+            self.__dict__[attr_name] = method(self)
+        return self.__dict__[attr_name]
+
+    return wrapper
+
+
+def published_posts_filter():
+    return Q(
+        is_published=True,
+        pub_date__lte=timezone.now(),
+        category__is_published=True
+    )
 
 
-def get_posts(manager=Post.objects, only_published=True, with_comments=False):
+# Наборы полей для разных страниц: список карточек не тянет
+# текст публикации, описание категории и хэш пароля автора.
+POST_PROJECTIONS = {
+    'card': {'only': (
+        'id', 'title', 'excerpt', 'pub_date', 'is_published',
+        'image', 'image_meta', 'image_variants', 'comment_count',
+        'author__id', 'author__username',
+        'category__id', 'category__title', 'category__slug',
+        'category__is_published',
+        'location__id', 'location__name', 'location__is_published',
+    )},
+    'feed': {'only': (
+        'id', 'title', 'text_html', 'pub_date', 'updated_at',
+        'author__id', 'author__username',
+        'category__id', 'category__title', 'location__id',
+    )},
+    'detail': {'defer': (
+        'text', 'excerpt', 'author__password', 'category__description',
+    )},
+}
+
+
+def get_posts(manager=Post.objects, only_published=True, projection=None):
     posts = manager.select_related('author', 'category', 'location')
 
-    if only_published:
-        posts = posts.filter(
-            is_published=True,
-            pub_date__lte=timezone.now(),
-            category__is_published=True
-        )
+    if projection is not None:
+        for method, fields in POST_PROJECTIONS[projection].items():
+            posts = getattr(posts, method)(*fields)
 
-    if with_comments:
-        posts = posts.annotate(comment_count=Count('comments'))
+    if only_published:
+        posts = posts.filter(published_posts_filter())
 
     return posts.order_by('-pub_date')
 
 
+def posts_last_modified(posts):
+    """Время последнего изменения страницы с этими публикациями.
+
+    Один агрегатный запрос. Скрытие публикации или категории тоже
+    сдвигает updated_at, а наступление даты отложенной публикации
+    учитывается через pub_date видимых публикаций.
+    """
+    values = posts.aggregate(
+        updated=Max('updated_at'),
+        category_updated=Max('category__updated_at'),
+        published=Max('pub_date', filter=published_posts_filter()),
+    ).values()
+    return max((value for value in values if value), default=None)
+
+
+def visible_posts_filter(user):
+    """Публикации, видимые пользователю: автор видит и свои скрытые."""
+    visible = published_posts_filter()
+    if user.is_authenticated:
+        visible |= Q(author=user)
+    return visible
+
+
+def get_visible_post(user, post_id):
+    """Публикация, видимая пользователю.
+
+    Проверка видимости выполняется в том же запросе, что и выборка
+    публикации.
+    """
+    return get_object_or_404(
+        get_posts(
+            only_published=False, projection='detail'
+        ).filter(visible_posts_filter(user)),
+        pk=post_id
+    )
+
+
+def get_comments_page(post, cursor=None):
+    return CursorPaginator(
+        post.comments.select_related('author'),
+        LIMIT_COMMENTS,
+        ordering=('created_at', 'id')
+    ).page(cursor)
+
+
 class PostBaseMixin:
     def get_queryset(self):
-        return get_posts()
+        return get_posts(projection='card')
+
+
+def actual_comment_count():
+    counts = (
+        Comment.objects
+        .filter(post=OuterRef('pk'))
+        .order_by()
+        .values('post')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+class CursorPaginationMixin:
+    cursor_pagination = CURSOR_PAGINATION
+    cursor_kwarg = 'cursor'
+    cursor_ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.cursor_pagination:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(
+            queryset, page_size, ordering=self.cursor_ordering
+        )
+        page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
 
 
 class OnlyAuthorMixin(LoginRequiredMixin, UserPassesTestMixin):
+    @request_cached
+    def get_object(self, queryset=None):
+        return super().get_object(queryset)
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('category', 'location')
+
     def test_func(self):
-        obj = self.get_object()
-        return obj.author == self.request.user
+        return self.get_object().author_id == self.request.user.pk
 
     def handle_no_permission(self):
         post_id = self.kwargs.get('post_id')
@@ -0,0 +1,224 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F, FloatField, Func, Lookup, Value
+from django.utils.module_loading import import_string
+
+from blogicum.settings import SEARCH_BACKEND, SEARCH_TOKENIZER
+
+from .models import Post, PostSearchEntry
+
+try:
+    import snowballstemmer
+except ImportError:
+    snowballstemmer = None
+
+WORD_RE = re.compile(r'\w+')
+TRIGGERS = ('ai', 'ad', 'au')
+
+
+class Match(Lookup):
+    """Условие FTS5 «столбец MATCH запрос»."""
+
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+PostSearchEntry._meta.get_field('document').register_lookup(Match)
+
+
+class SearchBackend:
+    """Полнотекстовый поиск по заголовку и тексту публикаций.
+
+    install()/uninstall() создают и удаляют индекс, is_installed()
+    проверяет, что он на месте, search() фильтрует переданный queryset
+    публикаций и сортирует его по релевантности — правила видимости
+    задаёт вызывающий код.
+    """
+
+    def install(self, schema_editor):
+        raise NotImplementedError
+
+    def is_installed(self, connection):
+        raise NotImplementedError
+
+    def uninstall(self, schema_editor):
+        raise NotImplementedError
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """Внешняя FTS5-таблица над blog_post и триггеры синхронизации.
+
+    Миграции, после которых SQLite пересоздаёт blog_post (добавление
+    и изменение полей), молча удаляют триггеры — их возвращает
+    ensure_search_index() после каждого migrate.
+    """
+
+    table = 'blog_post_fts'
+    tokenizers = {
+        'unicode61': 'unicode61 remove_diacritics 2',
+        # Подстроки из трёх символов: находит слова в любой форме.
+        'trigram': 'trigram',
+    }
+
+    def __init__(self, tokenizer=SEARCH_TOKENIZER):
+        self.tokenizer = tokenizer
+        self.stemmer = None
+        if tokenizer == 'unicode61' and snowballstemmer is not None:
+            self.stemmer = snowballstemmer.stemmer('russian')
+
+    def install(self, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        table = self.table
+        for statement in (
+            f"CREATE VIRTUAL TABLE {table} USING fts5("
+            f"title, text, content='blog_post', content_rowid='id', "
+            f"tokenize='{self.tokenizers[self.tokenizer]}')",
+            f"CREATE TRIGGER {table}_ai AFTER INSERT ON blog_post BEGIN "
+            f"INSERT INTO {table}(rowid, title, text) "
+            f"VALUES (new.id, new.title, new.text); END",
+            f"CREATE TRIGGER {table}_ad AFTER DELETE ON blog_post BEGIN "
+            f"INSERT INTO {table}({table}, rowid, title, text) "
+            f"VALUES ('delete', old.id, old.title, old.text); END",
+            f"CREATE TRIGGER {table}_au AFTER UPDATE OF title, text "
+            f"ON blog_post BEGIN "
+            f"INSERT INTO {table}({table}, rowid, title, text) "
+            f"VALUES ('delete', old.id, old.title, old.text); "
+            f"INSERT INTO {table}(rowid, title, text) "
+            f"VALUES (new.id, new.title, new.text); END",
+            f"INSERT INTO {table}({table}) VALUES ('rebuild')",
+        ):
+            schema_editor.execute(statement)
+
+    def is_installed(self, connection):
+        if connection.vendor != 'sqlite':
+            return True
+        names = {self.table, *(f'{self.table}_{s}' for s in TRIGGERS)}
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT name FROM sqlite_master WHERE name IN ({})'.format(
+                    ', '.join(['%s'] * len(names))
+                ),
+                list(names)
+            )
+            return {name for name, in cursor.fetchall()} == names
+
+    def uninstall(self, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for suffix in TRIGGERS:
+            schema_editor.execute(
+                f'DROP TRIGGER IF EXISTS {self.table}_{suffix}'
+            )
+        schema_editor.execute(f'DROP TABLE IF EXISTS {self.table}')
+
+    def match_expression(self, query):
+        terms = WORD_RE.findall(query.lower())
+        if self.stemmer:
+            # Основа слова как префикс: «публикации» найдёт «публикация».
+            return ' '.join(
+                f'"{stem}"*' for stem in self.stemmer.stemWords(terms)
+            )
+        return ' '.join(f'"{term}"' for term in terms)
+
+    def search(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        # Индекс присоединяется к blog_post по rowid (PostSearchEntry):
+        # bm25 считается за один проход по найденным строкам.
+        rank = Func(
+            F('search_entry__document'), Value(10.0), Value(1.0),
+            function='bm25', output_field=FloatField()
+        )
+        return queryset.filter(search_entry__document__match=match).annotate(
+            rank=rank
+        ).order_by('rank', '-pub_date')
+
+
+class PostgreSQLBackend(SearchBackend):
+    config = 'russian'
+    index_name = 'blog_post_search_idx'
+
+    def vector(self):
+        from django.contrib.postgres.search import SearchVector
+
+        return (
+            SearchVector('title', weight='A', config=self.config)
+            + SearchVector('text', weight='B', config=self.config)
+        )
+
+    def install(self, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {self.index_name} ON blog_post '
+            f"USING GIN ((setweight(to_tsvector('{self.config}', "
+            "coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{self.config}', "
+            "coalesce(text, '')), 'B')))"
+        )
+
+    def is_installed(self, connection):
+        if connection.vendor != 'postgresql':
+            return True
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_indexes WHERE indexname = %s",
+                [self.index_name]
+            )
+            return cursor.fetchone() is not None
+
+    def uninstall(self, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        schema_editor.execute(f'DROP INDEX IF EXISTS {self.index_name}')
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        if not WORD_RE.search(query):
+            return queryset.none()
+        search_query = SearchQuery(
+            query, config=self.config, search_type='websearch'
+        )
+        vector = self.vector()
+        return queryset.annotate(
+            search=vector, rank=SearchRank(vector, search_query)
+        ).filter(search=search_query).order_by('-rank', '-pub_date')
+
+
+def get_search_backend():
+    return import_string(SEARCH_BACKEND)()
+
+
+def ensure_search_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """Ставит поисковый индекс заново, если его нет или он неполон.
+
+    Если таблицы публикаций нет (миграции blog откатили), снимает
+    оставшийся индекс.
+
+    Подключается к post_migrate: единое место установки индекса
+    вместо шагов в каждой миграции, меняющей blog_post.
+    """
+    connection = connections[using]
+    backend = get_search_backend()
+    if Post._meta.db_table not in connection.introspection.table_names():
+        # Миграции blog откатили до нуля: индекс и триггеры уходят
+        # вместе с таблицей публикаций.
+        with connection.schema_editor() as schema_editor:
+            backend.uninstall(schema_editor)
+        return
+    if backend.is_installed(connection):
+        return
+    with connection.schema_editor() as schema_editor:
+        backend.uninstall(schema_editor)
+        backend.install(schema_editor)
@@ -0,0 +1,150 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import (
+    bump_all_cards,
+    bump_author_cards,
+    bump_card,
+    bump_lists,
+    bump_pages,
+    bump_post_page,
+)
+from .images import schedule_release, schedule_variants, set_image_metadata
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+
+def change_comment_count(post_id, delta):
+    # Комментарии — часть страницы публикации, поэтому любое их
+    # изменение сдвигает и Post.updated_at. Счётчик, разошедшийся с
+    # фактом, не уходит ниже нуля (поле положительное). Ленты
+    # показывают счётчик, поэтому сбрасываются, только когда он
+    # меняется, а не при правке текста комментария.
+    Post.objects.filter(pk=post_id).update(
+        comment_count=Greatest(F('comment_count') + delta, 0),
+        updated_at=timezone.now()
+    )
+    bump_card(post_id)
+    bump_post_page(post_id)
+    if delta:
+        bump_lists()
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    instance._stored_post_id = instance.__dict__.get('post_id')
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    moved_from = instance._stored_post_id
+    instance._stored_post_id = instance.post_id
+    if created:
+        change_comment_count(instance.post_id, 1)
+    elif moved_from is not None and moved_from != instance.post_id:
+        # Комментарий перенесли к другой публикации (в админке).
+        change_comment_count(moved_from, -1)
+        change_comment_count(instance.post_id, 1)
+    else:
+        change_comment_count(instance.post_id, 0)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, origin=None, **kwargs):
+    # Комментарии удаляются каскадом вместе с публикацией — её
+    # счётчик обновлять незачем, а запрос был бы на каждый комментарий.
+    if isinstance(origin, Post) or getattr(origin, 'model', None) is Post:
+        return
+    change_comment_count(instance.post_id, -1)
+
+
+def stored_image_name(post):
+    # Читаем сырое значение, чтобы не загружать отложенное поле.
+    value = post.__dict__.get('image')
+    return getattr(value, 'name', value) or ''
+
+
+@receiver(post_init, sender=Post)
+def remember_image(sender, instance, **kwargs):
+    instance._stored_image = stored_image_name(instance)
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Post)
+def fill_fixture_updated_at(sender, instance, raw=False, **kwargs):
+    # loaddata сохраняет сырые объекты без auto_now, а в фикстурах,
+    # выгруженных до появления updated_at (db.json), поля нет.
+    if raw and instance.updated_at is None:
+        instance.updated_at = timezone.now()
+
+
+@receiver(pre_save, sender=Post)
+def render_post_text(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'text' in update_fields:
+        instance.render_text()
+
+
+@receiver(pre_save, sender=Post)
+def image_uploading(sender, instance, **kwargs):
+    # Незакоммиченный FieldFile — только что загруженный файл.
+    instance._image_uploaded = bool(
+        instance.image and not instance.image._committed
+    )
+    if instance._image_uploaded:
+        instance.image_variants = False
+        set_image_metadata(instance)
+    elif not instance.image:
+        set_image_metadata(instance)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, **kwargs):
+    if getattr(instance, '_image_uploaded', False):
+        schedule_variants(instance)
+    replaced = instance._stored_image
+    instance._stored_image = stored_image_name(instance)
+    if replaced and replaced != instance._stored_image:
+        schedule_release(replaced)
+    bump_card(instance.pk)
+    bump_post_page(instance.pk)
+    bump_lists()
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    schedule_release(stored_image_name(instance))
+    bump_card(instance.pk)
+    bump_post_page(instance.pk)
+    bump_lists()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def card_relation_changed(sender, **kwargs):
+    bump_all_cards()
+    bump_pages()
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, instance, created, update_fields=None, **kwargs):
+    # У нового пользователя нет карточек, а вход обновляет только
+    # last_login — карточек это не касается.
+    if created or (
+        update_fields is not None
+        and not set(update_fields) - {'last_login'}
+    ):
+        return
+    bump_author_cards(instance.pk)
+    bump_pages()
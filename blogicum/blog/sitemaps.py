@@ -0,0 +1,142 @@
+from xml.sax.saxutils import escape
+
+from django.contrib.auth import get_user_model
+from django.db.models import F, Max, OuterRef, Subquery
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+
+from blog.models import Category
+from blog.query_utils import get_posts
+from blogicum.settings import SITEMAP_SHARD_SIZE
+
+User = get_user_model()
+
+CHUNK_SIZE = 2000
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+class SitemapSection:
+    """Раздел карты сайта, разбитый на шарды по диапазонам id.
+
+    Шард n содержит объекты с id из [n * размер, (n + 1) * размер):
+    адреса шардов не сдвигаются при удалении объектов, а в каждом не
+    больше SITEMAP_SHARD_SIZE ссылок.
+    """
+
+    key_field = 'id'
+    lastmod_field = 'updated_at'
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def location(self, key):
+        raise NotImplementedError
+
+    def shards(self):
+        """Номера непустых шардов и их lastmod одним запросом."""
+        return (
+            self.get_queryset()
+            .annotate(shard=F('id') / SITEMAP_SHARD_SIZE)
+            .values('shard')
+            .annotate(lastmod=Max(self.lastmod_field))
+            .order_by('shard')
+            .values_list('shard', 'lastmod')
+        )
+
+    def rows(self, shard):
+        return (
+            self.get_queryset()
+            .filter(
+                id__gte=shard * SITEMAP_SHARD_SIZE,
+                id__lt=(shard + 1) * SITEMAP_SHARD_SIZE,
+            )
+            .order_by('id')
+            .values_list(self.key_field, self.lastmod_field)
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+
+
+class PostsSection(SitemapSection):
+    def get_queryset(self):
+        return get_posts()
+
+    def location(self, key):
+        # Один reverse() на шард: в адресе меняется только id.
+        if not hasattr(self, 'post_url'):
+            self.post_url = reverse(
+                'blog:post_detail', args=[0]
+            ).replace('/0/', '/{}/')
+        return self.post_url.format(key)
+
+
+class CategoriesSection(SitemapSection):
+    key_field = 'slug'
+
+    def get_queryset(self):
+        return Category.objects.filter(is_published=True)
+
+    def location(self, key):
+        return reverse('blog:category_posts', args=[key])
+
+
+class ProfilesSection(SitemapSection):
+    """Авторы хотя бы одной видимой публикации."""
+
+    key_field = 'username'
+    lastmod_field = 'lastmod_post'
+
+    def get_queryset(self):
+        latest = get_posts().filter(
+            author=OuterRef('pk')
+        ).order_by('-updated_at').values('updated_at')[:1]
+        return User.objects.annotate(
+            lastmod_post=Subquery(latest)
+        ).filter(lastmod_post__isnull=False)
+
+    def location(self, key):
+        return reverse('blog:profile', args=[key])
+
+
+SECTIONS = {
+    'posts': PostsSection,
+    'categories': CategoriesSection,
+    'profiles': ProfilesSection,
+}
+
+
+def lastmod_tag(lastmod):
+    return f'<lastmod>{lastmod.isoformat()}</lastmod>' if lastmod else ''
+
+
+def sitemap_index(request):
+    def generate():
+        yield f'{XML_HEADER}<sitemapindex xmlns="{XMLNS}">\n'
+        for name, section in SECTIONS.items():
+            for shard, lastmod in section().shards():
+                url = request.build_absolute_uri(reverse(
+                    'blog:sitemap', args=[name, shard]
+                ))
+                yield (
+                    f'<sitemap><loc>{escape(url)}</loc>'
+                    f'{lastmod_tag(lastmod)}</sitemap>\n'
+                )
+        yield '</sitemapindex>\n'
+
+    return StreamingHttpResponse(generate(), content_type='application/xml')
+
+
+def sitemap(request, section, shard):
+    if section not in SECTIONS:
+        raise Http404
+    section = SECTIONS[section]()
+    root = request.build_absolute_uri('/')[:-1]
+
+    def generate():
+        yield f'{XML_HEADER}<urlset xmlns="{XMLNS}">\n'
+        for key, lastmod in section.rows(shard):
+            url = escape(root + section.location(key))
+            yield f'<url><loc>{url}</loc>{lastmod_tag(lastmod)}</url>\n'
+        yield '</urlset>\n'
+
+    return StreamingHttpResponse(generate(), content_type='application/xml')
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+from contextlib import contextmanager
+
+from django.core.files import locks
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# Файл блокировки лежит вне каталогов загрузок, которые обходит
+# sweep_media.
+LOCK_NAME = '.blobs.lock'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит каждый уникальный файл один раз под его SHA-256.
+
+    Имя файла определяется содержимым: posts/ab/abcd….png. Повторная
+    загрузка того же файла возвращает уже сохранённое имя, а ссылки
+    на файл считаются по строкам модели (см. blog.images).
+    """
+
+    @contextmanager
+    def lock(self):
+        """Межпроцессная блокировка повторного использования и удаления.
+
+        Повторная загрузка обновляет mtime файла под блокировкой, а
+        удаление под ней же пропускает свежие файлы: запись о новой
+        публикации коммитится позже, чем файл возвращается из _save.
+        """
+        os.makedirs(self.location, exist_ok=True)
+        with open(self.path(LOCK_NAME), 'ab') as lock_file:
+            locks.lock(lock_file, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(lock_file)
+
+    def save_derived(self, name, content):
+        """Сохраняет производный файл (вариант) под заданным именем.
+
+        Запись атомарна: если тот же вариант одновременно готовит
+        другой процесс, файл просто заменяется таким же.
+        """
+        full_path = self.path(name)
+        if not os.path.exists(full_path):
+            temp_path, _ = self._write_temp(
+                os.path.dirname(full_path), content
+            )
+            self._publish(temp_path, full_path)
+        return name
+
+    def delete(self, name):
+        super().delete(name)
+        self.remove_empty_dirs(name)
+
+    def remove_empty_dirs(self, name):
+        """Удаляет опустевшие каталоги-шарды над файлом name.
+
+        Каталог верхнего уровня (posts/) остаётся на месте.
+        """
+        directory = posixpath.dirname(name)
+        while posixpath.dirname(directory):
+            try:
+                os.rmdir(self.path(directory))
+            except OSError:
+                # В каталоге есть другие файлы или его уже удалили.
+                return
+            directory = posixpath.dirname(directory)
+
+    def get_available_name(self, name, max_length=None):
+        # Итоговое имя выбирает _save по содержимому файла.
+        return name
+
+    def _write_temp(self, directory, content):
+        """Пишет содержимое во временный файл; возвращает путь и хэш."""
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temp_path = tempfile.mkstemp(
+            dir=directory, suffix='.part'
+        )
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(descriptor, 'wb') as temp_file:
+                content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return temp_path, digest.hexdigest()
+
+    def _publish(self, temp_path, full_path):
+        try:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            # mkstemp создаёт файл с правами 0600.
+            os.chmod(temp_path, self.file_permissions_mode or 0o644)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        temp_path, hexdigest = self._write_temp(
+            self.path(directory), content
+        )
+        name = posixpath.join(directory, hexdigest[:2], hexdigest + extension)
+        full_path = self.path(name)
+        with self.lock():
+            if os.path.exists(full_path):
+                # Свежий mtime защищает файл от удаления, пока запись
+                # новой публикации не закоммичена.
+                os.utime(full_path)
+                os.remove(temp_path)
+            else:
+                self._publish(temp_path, full_path)
+        return name
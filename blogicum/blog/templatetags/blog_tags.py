@@ -0,0 +1,29 @@
+from django import template
+
+from blog.cache import card_version as get_card_version
+from blog.images import variant_urls
+from blogicum.settings import PAGINATOR_ON_EACH_SIDE, PAGINATOR_ON_ENDS
+
+register = template.Library()
+
+
+@register.simple_tag
+def card_version(post):
+    return get_card_version(post.pk, post.author_id)
+
+
+@register.simple_tag
+def page_window(page_obj):
+    """Номера страниц вокруг текущей плюс первые и последние."""
+    return page_obj.paginator.get_elided_page_range(
+        page_obj.number,
+        on_each_side=PAGINATOR_ON_EACH_SIDE,
+        on_ends=PAGINATOR_ON_ENDS
+    )
+
+
+@register.simple_tag
+def image_srcset(post, fmt):
+    return ', '.join(
+        f'{url} {width}w' for url, width in variant_urls(post, fmt)
+    )
@@ -1,6 +1,6 @@
 from django.urls import path, include
 
-from . import views
+from . import feeds, sitemaps, views
 
 app_name = 'blog'
 
@@ -19,6 +19,7 @@ posts_patterns = [
 ]
 
 comments_patterns = [
+    path('comments/', views.post_comments, name='post_comments'),
     path('comment/', views.add_comment, name='add_comment'),
     path('edit_comment/<int:comment_id>/',
          views.edit_comment, name='edit_comment'),
@@ -29,12 +30,31 @@ comments_patterns = [
 profile_patterns = [
     path('edit/', views.ProfileUpdateView.as_view(), name='edit_profile'),
     path('<str:username>/', views.ProfileView.as_view(), name='profile'),
+    path('<str:username>/rss/',
+         feeds.conditional_feed(feeds.AuthorPostsFeed),
+         name='author_feed_rss'),
+    path('<str:username>/atom/',
+         feeds.conditional_feed(feeds.AtomAuthorPostsFeed),
+         name='author_feed_atom'),
 ]
 
 urlpatterns = [
     path('', views.PostListView.as_view(), name='index'),
     path('category/<slug:category_slug>/',
          views.CategoryPostsView.as_view(), name='category_posts'),
+    path('category/<slug:category_slug>/rss/',
+         feeds.conditional_feed(feeds.CategoryPostsFeed),
+         name='category_feed_rss'),
+    path('category/<slug:category_slug>/atom/',
+         feeds.conditional_feed(feeds.AtomCategoryPostsFeed),
+         name='category_feed_atom'),
+    path('rss/', feeds.conditional_feed(feeds.PostsFeed), name='feed_rss'),
+    path('atom/', feeds.conditional_feed(feeds.AtomPostsFeed),
+         name='feed_atom'),
+    path('sitemap.xml', sitemaps.sitemap_index, name='sitemap_index'),
+    path('sitemap-<slug:section>-<int:shard>.xml', sitemaps.sitemap,
+         name='sitemap'),
+    path('search/', views.SearchView.as_view(), name='search'),
     path('profile/', include(profile_patterns)),
     path('posts/', include(posts_patterns)),
     path('posts/<int:post_id>/', include(comments_patterns)),
@@ -2,10 +2,12 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.forms import modelform_factory
 from django.http import HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils.http import urlencode
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -14,7 +16,23 @@ from django.views.generic import (
     UpdateView,
 )
 
-from blog.query_utils import PostBaseMixin, OnlyAuthorMixin, get_posts
+from blog.cache import (
+    POST_PAGE_KEY,
+    AnonymousPageCacheMixin,
+    ConditionalGetMixin,
+)
+from blog.query_utils import (
+    CursorPaginationMixin,
+    OnlyAuthorMixin,
+    PostBaseMixin,
+    get_comments_page,
+    get_posts,
+    get_visible_post,
+    posts_last_modified,
+    request_cached,
+    visible_posts_filter,
+)
+from blog.search import get_search_backend
 from blogicum.settings import LIMIT_POSTS
 from .forms import CommentForm, PostForm
 from .models import Category, Comment, Post
@@ -22,20 +40,36 @@ from .models import Category, Comment, Post
 User = get_user_model()
 
 
-class PostListView(PostBaseMixin, ListView):
+class PostListView(
+    AnonymousPageCacheMixin, ConditionalGetMixin, CursorPaginationMixin,
+    PostBaseMixin, ListView
+):
     template_name = 'blog/index.html'
     context_object_name = 'post_list'
     paginate_by = LIMIT_POSTS
 
+    def get_last_modified(self):
+        return posts_last_modified(Post.objects.all())
+
     def get_queryset(self):
-        return get_posts(with_comments=True)
+        return get_posts(projection='card')
 
 
-class CategoryPostsView(PostBaseMixin, ListView):
+class CategoryPostsView(
+    AnonymousPageCacheMixin, ConditionalGetMixin, CursorPaginationMixin,
+    PostBaseMixin, ListView
+):
     template_name = 'blog/category.html'
     context_object_name = 'post_list'
     paginate_by = LIMIT_POSTS
 
+    def get_last_modified(self):
+        return posts_last_modified(Post.objects.filter(
+            category__slug=self.kwargs['category_slug'],
+            category__is_published=True
+        ))
+
+    @request_cached
     def get_category(self):
         return get_object_or_404(
             Category,
@@ -50,7 +84,28 @@ class CategoryPostsView(PostBaseMixin, ListView):
 
     def get_queryset(self):
         category = self.get_category()
-        return get_posts().filter(category=category)
+        return get_posts(projection='card').filter(category=category)
+
+
+class SearchView(PostBaseMixin, ListView):
+    template_name = 'blog/search.html'
+    context_object_name = 'post_list'
+    paginate_by = LIMIT_POSTS
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return get_search_backend().search(
+            super().get_queryset(), self.get_search_query()
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_search_query()
+        context['query'] = query
+        context['page_query'] = urlencode({'q': query}) + '&'
+        return context
 
 
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
@@ -68,11 +123,20 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         return self.request.user
 
 
-class ProfileView(ListView):
+class ProfileView(
+    AnonymousPageCacheMixin, ConditionalGetMixin, CursorPaginationMixin,
+    ListView
+):
     template_name = 'blog/profile.html'
     context_object_name = 'post_list'
     paginate_by = LIMIT_POSTS
 
+    def get_last_modified(self):
+        return posts_last_modified(Post.objects.filter(
+            author__username=self.kwargs['username']
+        ))
+
+    @request_cached
     def get_author(self):
         return get_object_or_404(User, username=self.kwargs['username'])
 
@@ -82,44 +146,41 @@ class ProfileView(ListView):
         return get_posts(
             manager=author.posts,
             only_published=show_only_published,
-            with_comments=True
+            projection='card'
         )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        author = self.get_author()
-
-        if not author.first_name:
-            author.first_name = author.username
-            author.save(update_fields=['first_name'])
-
-        context['profile'] = author
+        context['profile'] = self.get_author()
         return context
 
 
-class PostDetailView(DetailView):
+class PostDetailView(AnonymousPageCacheMixin, ConditionalGetMixin, DetailView):
     template_name = 'blog/detail.html'
     context_object_name = 'post'
     pk_url_kwarg = 'post_id'
 
-    def get_object(self, queryset=None):
-        post = get_object_or_404(
-            get_posts(only_published=False),
-            pk=self.kwargs['post_id']
-        )
-
-        if self.request.user == post.author:
-            return post
+    def get_page_scope_key(self):
+        return POST_PAGE_KEY.format(self.kwargs['post_id'])
 
-        return get_object_or_404(
-            get_posts(),
+    def get_last_modified(self):
+        # Для скрытой от пользователя публикации валидатора нет: вместо
+        # 304 отработает get_object() и ответит 404.
+        return posts_last_modified(Post.objects.filter(
+            visible_posts_filter(self.request.user),
             pk=self.kwargs['post_id']
-        )
+        ))
+
+    @request_cached
+    def get_object(self, queryset=None):
+        return get_visible_post(self.request.user, self.kwargs['post_id'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related('author')
+        context['comments'] = get_comments_page(
+            self.object, self.request.GET.get('cursor')
+        )
         return context
 
 
@@ -166,11 +227,20 @@ class PostDeleteView(OnlyAuthorMixin, DeleteView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         ProfileForm = modelform_factory(Post, exclude=('author',))
-        context['form'] = ProfileForm(instance=self.get_object())
+        context['form'] = ProfileForm(instance=self.object)
 
         return context
 
 
+def post_comments(request, post_id):
+    post = get_visible_post(request.user, post_id)
+    return render(request, 'includes/comments.html', {
+        'post': post,
+        'comments': get_comments_page(post, request.GET.get('cursor')),
+        'comments_fragment': True,
+    })
+
+
 @login_required
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
@@ -179,7 +249,8 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        with transaction.atomic():
+            comment.save()
     return redirect('blog:post_detail', post_id=post_id)
 
 
@@ -207,7 +278,8 @@ def delete_comment(request, post_id, comment_id):
         return HttpResponseForbidden()
 
     if request.method == 'POST':
-        comment.delete()
+        with transaction.atomic():
+            comment.delete()
         return redirect('blog:post_detail', post_id=post_id)
 
     return render(request, 'blog/comment.html', {
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +44,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.ServerTimingMiddleware',
+    'blog.middleware.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -86,6 +89,35 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    },
+    # Подходит и для любого совместимого с Redis сервера.
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL', 'redis://127.0.0.1:6379'),
+    },
+}
+
+# Сигналы сбрасывают кэш страниц и карточек только в общем кэше:
+# locmem годится для одного процесса, при нескольких процессах сервера
+# нужен 'redis' (пакет redis) или 'file' — см. проверку blog.W001
+# в `manage.py check --deploy`.
+BLOG_CACHE_BACKEND = os.getenv('BLOG_CACHE_BACKEND', 'locmem')
+
+CACHES = {
+    'default': CACHE_BACKENDS[BLOG_CACHE_BACKEND],
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -138,6 +170,17 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Уменьшенные копии Post.image для srcset: ширины в пикселях, качество
+# WebP/JPEG и число фоновых потоков, которые их готовят.
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_VARIANT_QUALITY = 80
+IMAGE_VARIANT_WORKERS = 2
+IMAGE_VARIANTS_ASYNC = True
+# Файл изображения без ссылок моложе стольких секунд не удаляется
+# сразу: повторная загрузка того же файла могла ещё не сохранить
+# запись о публикации. Такие файлы убирает `manage.py sweep_media`.
+IMAGE_RELEASE_GRACE = 600
+
 LOGIN_REDIRECT_URL = "blog:index"
 
 LOGIN_URL = "login"
@@ -147,3 +190,54 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 LIMIT_POSTS = 10
+
+LIMIT_COMMENTS = 20
+
+LIMIT_FEED = 20
+
+# Ссылок в одном файле карты сайта (предел протокола — 50 000).
+SITEMAP_SHARD_SIZE = 50_000
+
+# Сколько номеров страниц показывать вокруг текущей и по краям.
+PAGINATOR_ON_EACH_SIDE = 2
+PAGINATOR_ON_ENDS = 1
+
+# Курсорная (keyset) пагинация лент вместо ?page=N: страницы
+# без OFFSET и COUNT(*), но без номеров страниц.
+CURSOR_PAGINATION = False
+
+# Время жизни закэшированных страниц для анонимных посетителей, сек.
+# Ограничивает задержку появления отложенных публикаций в лентах.
+PAGE_CACHE_TIMEOUT = 60
+
+# Полнотекстовый поиск: реализация blog.search.SearchBackend и
+# токенизатор FTS5 — 'unicode61' (слова, запрос приводится к основам
+# русским стеммером) или 'trigram' (подстроки). После смены
+# токенизатора выполните `manage.py rebuild_search_index`.
+SEARCH_BACKEND = 'blog.search.SQLiteFTS5Backend'
+SEARCH_TOKENIZER = 'unicode61'
+
+# Доля запросов, для которых замеряются SQL, представление и рендер
+# (заголовок Server-Timing и строка в логгере blog.timing). В
+# продакшене — небольшая доля, например 0.01.
+SERVER_TIMING_SAMPLE_RATE = float(
+    os.getenv('SERVER_TIMING_SAMPLE_RATE', '1' if DEBUG else '0')
+)
+
+# Сколько раз запрос одной формы может повториться за HTTP-запрос,
+# прежде чем NPlusOneMiddleware сочтёт его N+1; None — не проверять.
+# NPLUSONE_RAISE включается в тестах (tests/fixtures/nplusone.py).
+NPLUSONE_THRESHOLD = 5
+NPLUSONE_RAISE = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'blog.timing': {'handlers': ['console'], 'level': 'INFO'},
+        'blog.nplusone': {'handlers': ['console'], 'level': 'WARNING'},
+    },
+}
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def raise_on_nplusone(settings):
+    """Повтор запроса одной формы в ответе на запрос роняет тест."""
+    settings.NPLUSONE_RAISE = True
@@ -0,0 +1,191 @@
+"""Бюджеты числа запросов и p95 времени ответа для всех маршрутов.
+
+Бюджеты лежат в tests/budgets.json. По умолчанию проверяются только
+код ответа и число запросов: время зависит от машины и нагрузки.
+Время проверяется по запросу: `BUDGETS_LATENCY=1 pytest
+tests/test_budgets.py` (p95 по LATENCY_SAMPLES замерам); на медленной
+машине бюджеты времени можно умножить: BUDGETS_LATENCY_FACTOR=2.
+После осознанного изменения запустите тесты с BUDGETS_UPDATE=1: файл
+будет перезаписан замерами (время — с запасом и только вместе с
+BUDGETS_LATENCY=1).
+"""
+import json
+import math
+import os
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+
+import blog.urls
+import pages.urls
+from blog.models import Category, Comment, Location, Post
+
+BUDGETS_PATH = Path(__file__).parent / "budgets.json"
+UPDATE = bool(os.getenv("BUDGETS_UPDATE"))
+CHECK_LATENCY = bool(os.getenv("BUDGETS_LATENCY"))
+LATENCY_FACTOR = float(os.getenv("BUDGETS_LATENCY_FACTOR", "1"))
+# При 20 замерах p95 — второе по величине время, а не максимум.
+LATENCY_SAMPLES = 20
+# Запас по времени при перезаписи бюджетов и нижняя граница, мс:
+# время ловит грубые регрессии, точные — число запросов.
+LATENCY_HEADROOM = 6
+LATENCY_FLOOR_MS = 100
+ROLES = ("anonymous", "author", "non_author")
+
+N_POSTS = 40
+N_COMMENTS = 30
+# Строка запроса для маршрутов, которым без неё нечего делать.
+QUERY_STRINGS = {"blog:search": "?q=публикации"}
+
+
+def walk_routes(patterns, namespace, params=frozenset()):
+    for pattern in patterns:
+        names = params | set(pattern.pattern.converters)
+        if isinstance(pattern, URLResolver):
+            yield from walk_routes(pattern.url_patterns, namespace, names)
+        elif pattern.name:
+            yield f"{namespace}:{pattern.name}", names
+
+
+ROUTES = dict(
+    [*walk_routes(blog.urls.urlpatterns, blog.urls.app_name),
+     *walk_routes(pages.urls.urlpatterns, pages.urls.app_name)]
+)
+
+
+@pytest.fixture
+def dataset():
+    """Несколько авторов, категорий и десятки публикаций и комментариев."""
+    User = get_user_model()
+    users = [
+        User.objects.create_user(f"budget{number}", password="budget")
+        for number in range(4)
+    ]
+    categories = Category.objects.bulk_create(
+        Category(title=f"Категория {n}", slug=f"budget-{n}", description="")
+        for n in range(3)
+    )
+    locations = Location.objects.bulk_create(
+        Location(name=f"Место {n}") for n in range(3)
+    )
+    now = timezone.now()
+    posts = []
+    for number in range(N_POSTS):
+        post = Post(
+            title=f"Публикация {number}",
+            text="Текст публикации. " * 50,
+            pub_date=now - timedelta(hours=number),
+            author=users[number % len(users)],
+            category=categories[number % len(categories)],
+            location=locations[number % len(locations)],
+        )
+        post.render_text()
+        posts.append(post)
+    posts = Post.objects.bulk_create(posts)
+    post = posts[0]
+    comments = Comment.objects.bulk_create(
+        Comment(post=post, author=users[n % 2], text=f"Комментарий {n}")
+        for n in range(N_COMMENTS)
+    )
+    Post.objects.filter(pk=post.pk).update(comment_count=N_COMMENTS)
+    author = post.author
+    return {
+        "author": author,
+        "non_author": users[1],
+        "kwargs": {
+            "post_id": post.pk,
+            "comment_id": next(
+                comment.pk for comment in comments
+                if comment.author_id == author.pk
+            ),
+            "category_slug": post.category.slug,
+            "username": author.username,
+            "section": "posts",
+            "shard": 0,
+        },
+    }
+
+
+@pytest.fixture(scope="module")
+def budgets():
+    budgets = json.loads(BUDGETS_PATH.read_text()) if (
+        BUDGETS_PATH.exists()
+    ) else {}
+    yield budgets
+    if UPDATE:
+        BUDGETS_PATH.write_text(
+            json.dumps(budgets, indent=2, ensure_ascii=False, sort_keys=True)
+            + "\n"
+        )
+
+
+def measure(client, url, samples):
+    """Код ответа, число запросов и p95 времени холодного ответа."""
+    durations = []
+    for _ in range(samples):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(url)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            durations.append((time.perf_counter() - started) * 1000)
+    durations.sort()
+    p95 = durations[math.ceil(0.95 * len(durations)) - 1]
+    return response.status_code, len(queries), p95
+
+
+def test_budgets_cover_all_routes(budgets):
+    if UPDATE:
+        pytest.skip("бюджеты перезаписываются")
+    assert sorted(budgets) == sorted(ROUTES), (
+        "Убедитесь, что для каждого именованного маршрута заданы бюджеты"
+        " в tests/budgets.json."
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("role", ROLES)
+def test_route_budgets(role, client, dataset, budgets):
+    if role != "anonymous":
+        client.force_login(dataset[role])
+    samples = LATENCY_SAMPLES if CHECK_LATENCY else 1
+    exceeded = []
+    for name, params in sorted(ROUTES.items()):
+        url = reverse(
+            name, kwargs={key: dataset["kwargs"][key] for key in params}
+        ) + QUERY_STRINGS.get(name, "")
+        status, queries, p95 = measure(client, url, samples)
+        if UPDATE:
+            budget = budgets.setdefault(name, {}).setdefault(role, {})
+            budget.update(status=status, queries=queries)
+            if CHECK_LATENCY or "p95_ms" not in budget:
+                budget["p95_ms"] = math.ceil(
+                    max(p95 * LATENCY_HEADROOM, LATENCY_FLOOR_MS)
+                )
+            continue
+        budget = budgets.get(name, {}).get(role)
+        if budget is None:
+            exceeded.append(f"{name}: нет бюджета")
+            continue
+        if status != budget["status"]:
+            exceeded.append(f"{name}: код ответа {status}")
+        if queries > budget["queries"]:
+            exceeded.append(
+                f"{name}: {queries} запросов > {budget['queries']}"
+            )
+        if CHECK_LATENCY and p95 > budget["p95_ms"] * LATENCY_FACTOR:
+            exceeded.append(
+                f"{name}: p95 {p95:.1f} мс > {budget['p95_ms']} мс"
+            )
+    assert not exceeded, (
+        f"Превышены бюджеты ({role}): " + "; ".join(exceeded)
+    )
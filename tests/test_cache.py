@@ -0,0 +1,229 @@
+import json
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+
+from blog.cache import CARDS_GENERATION_KEY, card_version
+from blog.models import Post
+
+
+@pytest.mark.django_db
+def test_post_card_fragment_cache(
+        mixer, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.title in user_client.get("/").content.decode()
+
+    Post.objects.filter(pk=post.pk).update(title="Без сигнала")
+    assert "Без сигнала" not in user_client.get("/").content.decode(), (
+        "Убедитесь, что карточка публикации берётся из кэша фрагментов."
+    )
+
+    post.refresh_from_db()
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in user_client.get("/").content.decode(), (
+        "Убедитесь, что сохранение публикации сбрасывает кэш её карточки."
+    )
+
+    mixer.blend("blog.Comment", post=post)
+    assert "Комментарии (1)" in user_client.get("/").content.decode(), (
+        "Убедитесь, что новый комментарий сбрасывает кэш карточки."
+    )
+
+    category = post.category
+    category.title = "Другая категория"
+    category.save()
+    assert "Другая категория" in user_client.get("/").content.decode(), (
+        "Убедитесь, что изменение категории сбрасывает кэш карточек."
+    )
+
+
+@pytest.mark.django_db
+def test_author_change_bumps_only_own_cards(
+        mixer, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    other = mixer.blend("blog.Post", category=post.category)
+    generation = cache.get(CARDS_GENERATION_KEY)
+    own = card_version(post.pk, post.author_id)
+    foreign = card_version(other.pk, other.author_id)
+
+    get_user_model().objects.create_user("newcomer", password="x")
+    assert card_version(post.pk, post.author_id) == own, (
+        "Убедитесь, что регистрация пользователя не сбрасывает кэш"
+        " карточек."
+    )
+
+    author = post.author
+    author.username = "renamed"
+    author.save()
+    assert card_version(post.pk, post.author_id) != own, (
+        "Убедитесь, что изменение автора сбрасывает кэш его карточек."
+    )
+    assert card_version(other.pk, other.author_id) == foreign
+    assert cache.get(CARDS_GENERATION_KEY) == generation, (
+        "Убедитесь, что изменение автора не сбрасывает кэш всех карточек."
+    )
+    assert "renamed" in user_client.get("/").content.decode()
+
+
+@pytest.mark.django_db
+def test_anonymous_page_cache(
+        mixer, client, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    urls = (
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+    for url in urls:
+        response = client.get(url)
+        assert "Cookie" in response.headers["Vary"]
+
+    Post.objects.filter(pk=post.pk).update(text_html="Без сигнала")
+    for url in urls:
+        assert "Без сигнала" not in client.get(url).content.decode(), (
+            "Убедитесь, что анонимным посетителям страница отдаётся из кэша."
+        )
+    assert "Без сигнала" in user_client.get(
+        f"/posts/{post.id}/"
+    ).content.decode(), (
+        "Убедитесь, что авторизованные пользователи не получают страницы"
+        " из общего кэша."
+    )
+
+    mixer.blend("blog.Comment", post=post, text="Свежий комментарий")
+    assert "Свежий комментарий" in client.get(
+        f"/posts/{post.id}/"
+    ).content.decode(), (
+        "Убедитесь, что новый комментарий сбрасывает кэш страниц."
+    )
+
+
+@pytest.mark.django_db
+def test_comment_resets_only_its_post_page(
+        mixer, client, post_with_published_location
+):
+    post = post_with_published_location
+    other = mixer.blend(
+        "blog.Post", category=post.category, author=post.author
+    )
+    other_url = f"/posts/{other.id}/"
+    client.get("/")
+    client.get(other_url)
+    Post.objects.filter(pk=other.pk).update(
+        title="Без сигнала", text_html="Без сигнала"
+    )
+
+    mixer.blend("blog.Comment", post=post)
+    assert "Без сигнала" not in client.get(other_url).content.decode(), (
+        "Убедитесь, что комментарий не сбрасывает кэш страниц других"
+        " публикаций."
+    )
+    assert "Комментарии (1)" in client.get("/").content.decode(), (
+        "Убедитесь, что новый комментарий обновляет счётчик в лентах."
+    )
+
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in client.get("/").content.decode(), (
+        "Убедитесь, что изменение публикации сбрасывает кэш лент."
+    )
+
+
+@pytest.mark.django_db
+def test_conditional_get(
+        mixer, client, user_client, post_with_published_location,
+        django_assert_num_queries
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    response = client.get(url)
+    etag = response.headers["ETag"]
+    assert response.headers["Last-Modified"]
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        "Убедитесь, что страница из кэша отдаётся с кодом 304 без"
+        " запросов к базе."
+    )
+
+    response = user_client.get(url)
+    user_etag = response.headers["ETag"]
+    assert user_etag != etag
+    assert "Last-Modified" not in response.headers, (
+        "Убедитесь, что авторизованным пользователям не отдаётся"
+        " Last-Modified: он не различает пользователей."
+    )
+    # Сессия, пользователь и валидатор.
+    with django_assert_num_queries(3):
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=user_etag)
+    assert response.status_code == 304, (
+        "Убедитесь, что для ответа 304 достаточно одного запроса"
+        " валидатора."
+    )
+
+    mixer.blend("blog.Comment", post=post)
+    for client_, old_etag in ((client, etag), (user_client, user_etag)):
+        assert client_.get(
+            url, HTTP_IF_NONE_MATCH=old_etag
+        ).status_code == 200, (
+            "Убедитесь, что новый комментарий меняет ETag страницы"
+            " публикации."
+        )
+
+
+@pytest.mark.django_db
+def test_conditional_get_does_not_reveal_hidden_posts(
+        client, user_client, unpublished_posts_with_published_locations,
+        future_posts, posts_with_unpublished_category
+):
+    hidden = [
+        unpublished_posts_with_published_locations[0],
+        future_posts[0],
+        posts_with_unpublished_category[0],
+    ]
+    for post in hidden:
+        response = client.get(
+            f"/posts/{post.id}/",
+            HTTP_IF_NONE_MATCH="*",
+            HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT",
+        )
+        assert response.status_code == 404, (
+            "Убедитесь, что на условный запрос скрытой публикации"
+            " отвечается 404, а не 304."
+        )
+
+    url = f"/posts/{hidden[0].id}/"
+    etag = user_client.get(url).headers["ETag"]
+    assert user_client.get(
+        url, HTTP_IF_NONE_MATCH=etag
+    ).status_code == 304, (
+        "Убедитесь, что автор получает 304 для своей скрытой публикации."
+    )
+
+
+@pytest.mark.django_db
+def test_loaddata_fills_missing_updated_at(tmp_path):
+    # В db.json нет updated_at: фикстура выгружена до его появления.
+    # Права и журнал админки ссылаются на типы содержимого другой базы.
+    objects = [
+        obj for obj in json.loads((settings.BASE_DIR / "db.json").read_text())
+        if obj["model"].startswith("blog.") or obj["model"] == "auth.user"
+    ]
+    fixture = tmp_path / "db.json"
+    fixture.write_text(json.dumps(objects, ensure_ascii=False))
+    call_command("loaddata", str(fixture), stdout=StringIO())
+    assert Post.objects.count() == sum(
+        obj["model"] == "blog.post" for obj in objects
+    ), (
+        "Убедитесь, что `loaddata` загружает фикстуры без полей"
+        " updated_at."
+    )
@@ -0,0 +1,83 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_comments(
+        mixer, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.id}/comment/", {"text": "Первый"})
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что `Post.comment_count` увеличивается при добавлении"
+        " комментария."
+    )
+
+    comment = post.comments.first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.comments.all().delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что `Post.comment_count` уменьшается при удалении"
+        " комментариев, в том числе массовом."
+    )
+
+
+@pytest.mark.django_db
+def test_recount_comments_fixes_drift(
+        mixer, client, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=40)
+    assert "Комментарии (40)" in client.get("/").content.decode()
+
+    call_command("recount_comments", stdout=StringIO())
+
+    post.refresh_from_db()
+    assert post.comment_count == 2
+    assert "Комментарии (2)" in client.get("/").content.decode(), (
+        "Убедитесь, что `recount_comments` сбрасывает кэш лент с"
+        " исправленными счётчиками."
+    )
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_moved_comment(
+        mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    other = mixer.blend("blog.Post", author=user)
+    comment = mixer.blend("blog.Comment", post=post)
+    comment.post = other
+    comment.save()
+    post.refresh_from_db()
+    other.refresh_from_db()
+    assert (post.comment_count, other.comment_count) == (0, 1), (
+        "Убедитесь, что при переносе комментария к другой публикации"
+        " счётчик переходит вместе с ним."
+    )
+
+
+@pytest.mark.django_db
+def test_comment_count_never_negative(
+        mixer, user_client, user, post_with_published_location
+):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    Post.objects.filter(pk=post.pk).update(comment_count=0)
+    response = user_client.post(
+        f"/posts/{post.id}/delete_comment/{comment.id}/"
+    )
+    assert response.status_code == 302
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что разошедшийся счётчик комментариев не уходит"
+        " ниже нуля."
+    )
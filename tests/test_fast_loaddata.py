@@ -0,0 +1,104 @@
+import json
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.serializers.base import DeserializationError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog.management.commands.fast_loaddata import iter_json_array
+from blog.models import Category, Post
+from blog.search import get_search_backend
+
+DB_JSON = settings.BASE_DIR / "db.json"
+# Журнал админки и права ссылаются на типы содержимого, которых нет в
+# db.json и которые очищаются между транзакционными тестами.
+MODELS = {"auth.user", "blog.category", "blog.location", "blog.post"}
+
+
+def test_iter_json_array_streams_objects():
+    items = [{"pk": n, "fields": {"text": "а, б] {в}" * n}} for n in range(50)]
+    stream = StringIO(json.dumps(items, ensure_ascii=False, indent=2))
+    assert list(iter_json_array(stream, chunk_size=7)) == items, (
+        "Убедитесь, что `iter_json_array` читает массив кусками и"
+        " возвращает все его объекты."
+    )
+    assert list(iter_json_array(StringIO(" [ ] "))) == []
+    with pytest.raises(DeserializationError):
+        list(iter_json_array(StringIO('[{"pk": 1}'), chunk_size=4))
+
+
+@pytest.fixture
+def fixture_objects():
+    return [
+        obj for obj in json.loads(DB_JSON.read_text())
+        if obj["model"] in MODELS
+    ]
+
+
+@pytest.fixture
+def fixture(tmp_path, fixture_objects):
+    path = tmp_path / "db.json"
+    path.write_text(json.dumps(fixture_objects, ensure_ascii=False))
+    return path
+
+
+@pytest.mark.django_db(transaction=True)
+def test_fast_loaddata_restores_db_json(fixture, fixture_objects):
+    expected = Counter(obj["model"] for obj in fixture_objects)
+    for _ in range(2):
+        # Повторная загрузка перезаписывает объекты, а не дублирует их.
+        call_command("fast_loaddata", str(fixture), stdout=StringIO())
+        assert Post.objects.count() == expected["blog.post"]
+        assert Category.objects.count() == expected["blog.category"]
+
+    category = Category.objects.get(pk=1)
+    assert category.created_at.isoformat().startswith("2022-12-18T23:03"), (
+        "Убедитесь, что `fast_loaddata` сохраняет даты из фикстуры."
+    )
+    assert not Post.objects.filter(excerpt="").exists(), (
+        "Убедитесь, что `fast_loaddata` заполняет производные поля"
+        " публикаций."
+    )
+    assert get_search_backend().search(Post.objects.all(), "обед").exists()
+    new = Category.objects.create(title="Новая", slug="new", description="")
+    assert new.pk > expected["blog.category"], (
+        "Убедитесь, что после загрузки сброшены счётчики id."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_fast_loaddata_upserts_and_keeps_dates(fixture, fixture_objects):
+    # Команда вставляет через приватный manager._insert(raw=True) с
+    # OnConflict.UPDATE: тест закрепляет поведение, на которое она
+    # опирается.
+    call_command("fast_loaddata", str(fixture), stdout=StringIO())
+    Category.objects.update(title="Изменено", created_at=timezone.now())
+    Post.objects.update(title="Изменено", created_at=timezone.now())
+    call_command("fast_loaddata", str(fixture), stdout=StringIO())
+
+    for model in (Category, Post):
+        label = model._meta.label_lower
+        stored = {
+            obj["pk"]: obj["fields"] for obj in fixture_objects
+            if obj["model"] == label
+        }
+        loaded = {
+            row["pk"]: row
+            for row in model.objects.values("pk", "title", "created_at")
+        }
+        assert loaded.keys() == stored.keys()
+        for pk, fields in stored.items():
+            assert loaded[pk]["title"] == fields["title"], (
+                "Убедитесь, что повторная загрузка перезаписывает"
+                " существующие объекты значениями из фикстуры."
+            )
+            assert loaded[pk]["created_at"] == parse_datetime(
+                fields["created_at"]
+            ), (
+                "Убедитесь, что `fast_loaddata` сохраняет даты"
+                " auto_now_add из фикстуры."
+            )
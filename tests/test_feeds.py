@@ -0,0 +1,59 @@
+import pytest
+
+from blog.models import Post
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("kind", ["rss", "atom"])
+def test_feeds_list_visible_posts(
+        kind, client, post_with_published_location,
+        unpublished_posts_with_published_locations
+):
+    post = post_with_published_location
+    hidden = unpublished_posts_with_published_locations[0]
+    for url in (
+        f"/{kind}/",
+        f"/category/{post.category.slug}/{kind}/",
+        f"/profile/{post.author.username}/{kind}/",
+    ):
+        response = client.get(url)
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert post.title in content, (
+            f"Убедитесь, что лента `{url}` содержит опубликованные записи."
+        )
+        assert hidden.title not in content, (
+            f"Убедитесь, что лента `{url}` не содержит скрытых записей."
+        )
+
+
+@pytest.mark.django_db
+def test_feed_conditional_get(
+        client, post_with_published_location, django_assert_num_queries
+):
+    post = post_with_published_location
+    response = client.get("/rss/")
+    etag = response.headers["ETag"]
+    assert response.headers["Last-Modified"]
+
+    # Только агрегат по дате последней публикации, без выборки ленты.
+    with django_assert_num_queries(1):
+        response = client.get("/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        "Убедитесь, что неизменившаяся лента отдаётся с кодом 304."
+    )
+
+    post.title = "Новый заголовок"
+    post.save()
+    response = client.get("/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что правка публикации меняет ETag ленты."
+    )
+    assert "Новый заголовок" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_feed_of_hidden_category_not_found(client, mixer):
+    category = mixer.blend("blog.Category", is_published=False)
+    assert not Post.objects.exists()
+    assert client.get(f"/category/{category.slug}/rss/").status_code == 404
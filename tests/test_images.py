@@ -0,0 +1,230 @@
+import os
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from blog.images import release_image, variant_name
+from blog.models import Post
+from blog.storage import ContentAddressedStorage
+
+
+@pytest.fixture
+def uploaded_png():
+    buffer = BytesIO()
+    Image.new("RGBA", (1600, 900), (255, 0, 0, 128)).save(buffer, "PNG")
+    return SimpleUploadedFile(
+        "photo.png", buffer.getvalue(), content_type="image/png"
+    )
+
+
+@pytest.mark.django_db
+def test_image_variants_generated_on_upload(
+        settings, post_with_published_location, uploaded_png, client,
+        django_capture_on_commit_callbacks
+):
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image = uploaded_png
+        post.save()
+
+    post.refresh_from_db()
+    assert post.image_variants
+    assert post.image_meta["width"] == 1600
+    assert post.image_meta["height"] == 900
+    assert post.image_meta["format"] == "PNG"
+    assert post.image_meta["size"] == uploaded_png.size
+    assert len(post.image_meta["hash"]) == 64
+    storage = post.image.storage
+    for width in settings.IMAGE_VARIANT_WIDTHS:
+        for fmt in ("webp", "jpeg"):
+            name = variant_name(post.image.name, width, fmt)
+            with storage.open(name) as file:
+                assert Image.open(file).width == min(width, 1600)
+
+    content = client.get(f"/posts/{post.id}/").content.decode()
+    assert 'type="image/webp"' in content
+    assert 'width="1600" height="900"' in content
+    assert storage.url(variant_name(post.image.name, 640, "webp")) in content
+
+
+@pytest.mark.django_db
+def test_no_variants_wider_than_original(
+        post_with_published_location, django_capture_on_commit_callbacks
+):
+    buffer = BytesIO()
+    Image.new("RGB", (500, 300)).save(buffer, "PNG")
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image = SimpleUploadedFile("small.png", buffer.getvalue())
+        post.save()
+
+    storage = post.image.storage
+    assert storage.exists(variant_name(post.image.name, 320, "webp"))
+    for width in (640, 1280):
+        for fmt in ("webp", "jpeg"):
+            assert not storage.exists(
+                variant_name(post.image.name, width, fmt)
+            ), (
+                "Убедитесь, что варианты не шире оригинала не создаются:"
+                " они были бы его копиями."
+            )
+
+
+@pytest.mark.django_db
+def test_backfill_image_metadata(
+        post_with_published_location, uploaded_png, client,
+        django_capture_on_commit_callbacks
+):
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image = uploaded_png
+        post.save()
+    Post.objects.filter(pk=post.pk).update(image_meta={})
+    dimensions = 'width="1600" height="900"'
+    # Карточка и страница попадают в кэш без габаритов.
+    assert dimensions not in client.get("/").content.decode()
+
+    call_command("backfill_image_metadata", stdout=StringIO())
+
+    post.refresh_from_db()
+    assert post.image_meta["width"] == 1600
+    assert len(post.image_meta["hash"]) == 64
+    assert dimensions in client.get("/").content.decode(), (
+        "Убедитесь, что `backfill_image_metadata` сбрасывает кэш карточек"
+        " и страниц обновлённых публикаций."
+    )
+
+
+@pytest.mark.django_db
+def test_generate_image_variants_recovers_lost_jobs(
+        post_with_published_location, uploaded_png,
+        django_capture_on_commit_callbacks
+):
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image = uploaded_png
+        post.save()
+    storage = post.image.storage
+    lost = variant_name(post.image.name, 640, "webp")
+    storage.delete(lost)
+    Post.objects.filter(pk=post.pk).update(image_variants=False)
+
+    call_command("generate_image_variants", stdout=StringIO())
+
+    post.refresh_from_db()
+    assert post.image_variants and storage.exists(lost), (
+        "Убедитесь, что `generate_image_variants` доделывает варианты"
+        " изображений, обработка которых прервалась."
+    )
+
+
+@pytest.mark.django_db
+def test_identical_uploads_share_one_file(
+        mixer, user, published_category, uploaded_png,
+        django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        first, second = mixer.cycle(2).blend(
+            "blog.Post", author=user, category=published_category
+        )
+        for post in (first, second):
+            uploaded_png.seek(0)
+            post.image = uploaded_png
+            post.save()
+
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые изображения хранятся одним файлом."
+    )
+    name = first.image.name
+    storage = first.image.storage
+    variant = variant_name(name, 320, "webp")
+    assert storage.exists(name) and storage.exists(variant)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert storage.exists(name), (
+        "Убедитесь, что файл не удаляется, пока на него ссылаются"
+        " другие публикации."
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        second.image = None
+        second.save()
+    assert storage.exists(name), (
+        "Убедитесь, что только что загруженный файл не удаляется сразу:"
+        " его могла переиспользовать незакоммиченная публикация."
+    )
+
+    os.utime(storage.path(name), (0, 0))
+    release_image(name)
+    assert not storage.exists(name) and not storage.exists(variant), (
+        "Убедитесь, что файл без ссылок удаляется вместе с вариантами."
+    )
+    assert not os.path.exists(storage.path(os.path.dirname(name))), (
+        "Убедитесь, что опустевший каталог файла тоже удаляется."
+    )
+
+
+def test_reused_file_survives_sweep(tmp_path):
+    storage = ContentAddressedStorage(location=tmp_path)
+    name = storage.save("posts/a.png", ContentFile(b"image"))
+    os.utime(storage.path(name), (0, 0))
+    assert storage.save("posts/b.png", ContentFile(b"image")) == name
+    assert os.path.getmtime(storage.path(name)) > 0, (
+        "Убедитесь, что повторная загрузка файла обновляет его mtime,"
+        " чтобы sweep_media и release_image его не удалили."
+    )
+
+
+def test_save_derived_tolerates_concurrent_writer(tmp_path, monkeypatch):
+    storage = ContentAddressedStorage(location=tmp_path)
+    name = "posts/ab/a.png.320w.webp"
+    storage.save_derived(name, ContentFile(b"first"))
+    # Другой процесс записал вариант между проверкой и записью.
+    monkeypatch.setattr(os.path, "exists", lambda path: False)
+    assert storage.save_derived(name, ContentFile(b"second")) == name
+    monkeypatch.undo()
+    with storage.open(name) as file:
+        assert file.read() == b"second"
+
+
+@pytest.mark.django_db
+def test_sweep_media_removes_orphans(
+        post_with_published_location, uploaded_png, tmp_path,
+        django_capture_on_commit_callbacks
+):
+    quarantine = tmp_path / "quarantine"
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image = uploaded_png
+        post.save()
+    storage = post.image.storage
+    kept = [post.image.name, variant_name(post.image.name, 320, "webp")]
+    orphans = [
+        storage.save("posts/orphan.png", ContentFile(b"orphan")),
+        storage.save_derived("posts/zz/gone.png.640w.webp", ContentFile(b"")),
+    ]
+    for name in kept + orphans:
+        os.utime(storage.path(name), (0, 0))
+
+    call_command("sweep_media", "--dry-run", stdout=StringIO())
+    assert all(storage.exists(name) for name in orphans)
+
+    call_command(
+        "sweep_media", "--quarantine", str(quarantine), stdout=StringIO()
+    )
+    assert all(storage.exists(name) for name in kept), (
+        "Убедитесь, что файлы, на которые ссылаются публикации, и их"
+        " варианты не удаляются."
+    )
+    for name in orphans:
+        assert not storage.exists(name)
+        assert (quarantine / name).exists()
+        assert not os.path.exists(storage.path(os.path.dirname(name))), (
+            "Убедитесь, что `sweep_media` удаляет опустевшие каталоги."
+        )
+    assert os.path.isdir(storage.path("posts"))
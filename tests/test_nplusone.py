@@ -0,0 +1,39 @@
+import pytest
+
+from blog.models import Post
+from blog.nplusone import NPlusOneError, normalize_sql
+
+
+def test_normalize_sql():
+    assert normalize_sql(
+        "SELECT *  FROM t WHERE a = 'x' AND id IN (%s, %s, %s) LIMIT 21"
+    ) == normalize_sql(
+        "SELECT * FROM t WHERE a = 'y' AND id IN (%s) LIMIT 10"
+    )
+
+
+@pytest.mark.django_db
+def test_per_row_queries_raise(
+        monkeypatch, mixer, client, published_category, published_location
+):
+    mixer.cycle(6).blend(
+        "blog.Post", category=published_category,
+        location=published_location, is_published=True,
+        pub_date="2000-01-01T00:00:00Z",
+    )
+    monkeypatch.setattr(
+        "blog.views.get_posts",
+        lambda **kwargs: Post.objects.order_by("-pub_date")
+    )
+    with pytest.raises(NPlusOneError, match="blog_category"):
+        client.get("/")
+
+
+@pytest.mark.django_db
+def test_delete_post_with_comments(
+        mixer, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(10).blend("blog.Comment", post=post)
+    user_client.post(f"/posts/{post.id}/delete/")
+    assert not Post.objects.filter(pk=post.pk).exists()
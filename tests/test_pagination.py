@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+import pytest
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from blog.paginators import CursorPaginator
+from blog.query_utils import get_posts
+from blog.views import CategoryPostsView, PostListView, ProfileView
+from blogicum.settings import LIMIT_COMMENTS
+from conftest import N_PER_PAGE
+
+
+@pytest.fixture
+def many_posts(mixer, user, published_category):
+    same_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=same_date,
+    )
+
+
+@pytest.fixture
+def cursor_views(monkeypatch):
+    for view in (PostListView, CategoryPostsView, ProfileView):
+        monkeypatch.setattr(view, "cursor_pagination", True)
+
+
+@pytest.mark.django_db
+def test_cursor_paginator_walks_forward_and_back(many_posts):
+    paginator = CursorPaginator(get_posts(), N_PER_PAGE)
+    pages = [paginator.page()]
+    while pages[-1].has_next():
+        pages.append(paginator.page(pages[-1].next_cursor))
+
+    seen = [post.id for page in pages for post in page]
+    assert len(seen) == len(set(seen)) == len(many_posts), (
+        "Убедитесь, что курсорная пагинация выдаёт каждую публикацию ровно"
+        " один раз, даже при совпадающих датах публикации."
+    )
+    assert not pages[0].has_previous()
+
+    back = paginator.page(pages[-1].previous_cursor)
+    assert [post.id for post in back] == [post.id for post in pages[-2]], (
+        "Убедитесь, что ссылка на предыдущую страницу возвращает ту же"
+        " страницу, что была показана при движении вперёд."
+    )
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_in_views(
+        many_posts, published_category, user, client, cursor_views
+):
+    urls = (
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    )
+    for url in urls:
+        response = client.get(url)
+        page = response.context["page_obj"]
+        assert len(page) == N_PER_PAGE
+        assert f"?cursor={page.next_cursor}" in response.content.decode()
+
+        response = client.get(url, {"cursor": page.next_cursor})
+        assert response.status_code == 200
+        assert response.context["page_obj"].has_previous()
+
+    assert client.get("/", {"cursor": "not-a-cursor"}).status_code == 404, (
+        "Убедитесь, что некорректный курсор приводит к ответу 404."
+    )
+
+
+@pytest.mark.django_db
+def test_comments_are_paginated(mixer, client, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(LIMIT_COMMENTS + 5).blend(
+        "blog.Comment", post=post
+    )
+
+    response = client.get(f"/posts/{post.id}/")
+    page = response.context["comments"]
+    assert [c.id for c in page] == [c.id for c in comments[:LIMIT_COMMENTS]], (
+        "Убедитесь, что на странице публикации выводится только первая"
+        " страница комментариев."
+    )
+
+    response = client.get(
+        f"/posts/{post.id}/comments/", {"cursor": page.next_cursor}
+    )
+    assert response.status_code == 200
+    assert [c.id for c in response.context["comments"]] == [
+        c.id for c in comments[LIMIT_COMMENTS:]
+    ]
+    assert "<form" not in response.content.decode(), (
+        "Убедитесь, что фрагмент комментариев не содержит формы и"
+        " разметки страницы."
+    )
+
+
+def test_paginator_renders_page_window():
+    paginator = Paginator(range(N_PER_PAGE * 10_000), N_PER_PAGE)
+    html = render_to_string(
+        "includes/paginator.html", {"page_obj": paginator.page(5000)}
+    )
+    assert html.count('class="page-link"') < 20, (
+        "Убедитесь, что пагинатор выводит ссылки только на соседние"
+        " страницы, а не на все страницы ленты."
+    )
+    for number in (1, 4999, 5000, 5001, 10_000):
+        assert f">{number}<" in html
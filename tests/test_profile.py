@@ -0,0 +1,23 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+def test_profile_page_is_read_only(mixer, client):
+    author = mixer.blend(get_user_model(), first_name="", last_name="")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f"/profile/{author.username}/")
+
+    assert f"Имя пользователя: {author.username}" in response.content.decode()
+    writes = [
+        query["sql"] for query in queries
+        if not query["sql"].lstrip().upper().startswith("SELECT")
+    ]
+    assert not writes, (
+        "Убедитесь, что страница профиля не изменяет базу данных."
+    )
+    author.refresh_from_db()
+    assert author.first_name == ""
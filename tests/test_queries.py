@@ -0,0 +1,128 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+
+from blog.cache import CARDS_GENERATION_KEY, PAGES_GENERATION_KEY
+from blog.models import Post
+
+# Сессия и пользователь авторизованного клиента.
+AUTH_QUERIES = 2
+# Валидатор условного GET: max(updated_at) публикаций страницы.
+VALIDATOR_QUERIES = 1
+
+
+@pytest.fixture
+def post(mixer, post_with_published_location):
+    mixer.cycle(3).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+    return post_with_published_location
+
+
+@pytest.mark.django_db
+def test_category_looked_up_once(post, client, django_assert_num_queries):
+    # Категория, COUNT(*) пагинатора и страница публикаций.
+    with django_assert_num_queries(VALIDATOR_QUERIES + 3):
+        client.get(f"/category/{post.category.slug}/")
+
+
+@pytest.mark.django_db
+def test_index_cards_load_in_one_query(
+        post, client, django_assert_num_queries
+):
+    # COUNT(*) пагинатора и страница публикаций: проекции карточки
+    # хватает шаблону, отложенные поля не догружаются.
+    with django_assert_num_queries(VALIDATOR_QUERIES + 2):
+        response = client.get("/")
+    card = response.context["page_obj"][0]
+    assert {"text", "text_html"} <= card.get_deferred_fields()
+    assert "password" in card.author.get_deferred_fields(), (
+        "Убедитесь, что ленты не загружают хэш пароля автора."
+    )
+
+
+@pytest.mark.django_db
+def test_author_looked_up_once(post, client, django_assert_num_queries):
+    # Автор, COUNT(*) пагинатора и страница публикаций.
+    with django_assert_num_queries(VALIDATOR_QUERIES + 3):
+        client.get(f"/profile/{post.author.username}/")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("action", ["edit", "delete"])
+def test_author_only_views_load_post_once(
+        post, user_client, another_user_client, action,
+        django_assert_num_queries
+):
+    url = f"/posts/{post.id}/{action}/"
+    # У формы редактирования ещё два запроса — варианты выбора
+    # категории и местоположения.
+    expected = AUTH_QUERIES + 1 + (2 if action == "edit" else 0)
+    with django_assert_num_queries(expected):
+        assert user_client.get(url).status_code == 200
+    with django_assert_num_queries(AUTH_QUERIES + 1):
+        assert another_user_client.get(url).status_code == 302
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("n_comments", [0, 50])
+def test_post_detail_query_count_is_fixed(
+        mixer, post_with_published_location, user_client, another_user_client,
+        client, n_comments, django_assert_num_queries
+):
+    post = post_with_published_location
+    mixer.cycle(n_comments).blend("blog.Comment", post=post)
+    url = f"/posts/{post.id}/"
+    # Публикация с проверкой видимости и комментарии с авторами.
+    with django_assert_num_queries(VALIDATOR_QUERIES + 2):
+        assert client.get(url).status_code == 200
+    with django_assert_num_queries(AUTH_QUERIES + VALIDATOR_QUERIES + 2):
+        assert another_user_client.get(url).status_code == 200
+
+
+@pytest.mark.django_db
+def test_post_detail_hidden_post(
+        unpublished_posts_with_published_locations, user_client,
+        another_user_client, django_assert_num_queries
+):
+    post = unpublished_posts_with_published_locations[0]
+    url = f"/posts/{post.id}/"
+    assert user_client.get(url).status_code == 200
+    with django_assert_num_queries(AUTH_QUERIES + VALIDATOR_QUERIES + 1):
+        assert another_user_client.get(url).status_code == 404
+
+
+@pytest.mark.django_db
+def test_feed_plans_restores_indexes(post):
+    out = StringIO()
+    call_command("feed_plans", repeat=1, stdout=out)
+    assert "без индексов лент" in out.getvalue()
+    with connection.cursor() as cursor:
+        indexes = connection.introspection.get_constraints(
+            cursor, "blog_post"
+        )
+    assert "post_published_feed_idx" in indexes, (
+        "Убедитесь, что `feed_plans` возвращает схему в исходное состояние."
+    )
+
+
+@pytest.mark.django_db
+def test_bench_projections_leaves_cache_alone(django_user_model):
+    django_user_model.objects.create_user("bench-projections")
+    cache.set(CARDS_GENERATION_KEY, "до замера")
+    cache.set(PAGES_GENERATION_KEY, "до замера")
+    call_command(
+        "bench_projections", posts=5, text_size=100, repeat=1,
+        stdout=StringIO()
+    )
+    assert cache.get_many([CARDS_GENERATION_KEY, PAGES_GENERATION_KEY]) == {
+        CARDS_GENERATION_KEY: "до замера",
+        PAGES_GENERATION_KEY: "до замера",
+    }, (
+        "Убедитесь, что `bench_projections` не сбрасывает настоящий кэш"
+        " карточек и страниц."
+    )
+    assert not Post.objects.exists()
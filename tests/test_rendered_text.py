@@ -0,0 +1,35 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+
+@pytest.mark.django_db
+def test_rendered_text_follows_text(mixer, post_with_published_location):
+    post = post_with_published_location
+    post.text = "<b>раз</b> два три\nчетыре пять шесть семь восемь девять" \
+        " десять одиннадцать"
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt == (
+        "<b>раз</b> два три четыре пять шесть семь восемь девять десять …"
+    ), "Убедитесь, что `Post.excerpt` хранит первые 10 слов текста."
+    assert post.text_html.startswith(
+        "&lt;b&gt;раз&lt;/b&gt; два три<br>четыре"
+    ), (
+        "Убедитесь, что `Post.text_html` хранит экранированный текст с"
+        " переносами строк `<br>`."
+    )
+
+
+@pytest.mark.django_db
+def test_render_post_texts_fixes_stale(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(excerpt="", text_html="")
+
+    call_command("render_post_texts", stdout=StringIO())
+
+    post.refresh_from_db()
+    assert post.excerpt and post.text_html
@@ -0,0 +1,83 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from blog.models import Post
+from blog.search import get_search_backend
+
+
+@pytest.mark.django_db
+def test_search_finds_ranked_visible_posts(
+        mixer, client, user, published_category,
+        unpublished_posts_with_published_locations
+):
+    in_title, in_text = mixer.cycle(2).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        title=(t for t in ("Публикация о кошках", "Про собак")),
+        text=(t for t in ("Текст", "Эта публикация немного и о кошках")),
+    )
+    hidden = unpublished_posts_with_published_locations[0]
+    hidden.title = "Скрытая публикация о кошках"
+    hidden.save()
+
+    response = client.get("/search/", {"q": "публикации кошка"})
+    found = [post.id for post in response.context["page_obj"]]
+    assert found == [in_title.id, in_text.id], (
+        "Убедитесь, что поиск учитывает формы слов, ранжирует совпадения"
+        " в заголовке выше и не показывает скрытые публикации."
+    )
+
+
+@pytest.mark.django_db
+def test_search_index_follows_changes(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    post.text = "уникальныйтермин"
+    post.save()
+    assert client.get("/search/", {"q": "уникальныйтермин"}).context[
+        "page_obj"
+    ].object_list, "Убедитесь, что индекс обновляется при изменении текста."
+
+    Post.objects.filter(pk=post.pk).delete()
+    response = client.get("/search/", {"q": "уникальныйтермин"})
+    assert not response.context["page_obj"].object_list
+    assert client.get("/search/", {"q": '"*) OR'}).status_code == 200
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migrate_restores_search_triggers(
+        client, post_with_published_location
+):
+    with connection.cursor() as cursor:
+        for suffix in ("ai", "ad", "au"):
+            cursor.execute(f"DROP TRIGGER blog_post_fts_{suffix}")
+    call_command("migrate", verbosity=0)
+
+    post = post_with_published_location
+    post.text = "уникальныйтермин"
+    post.save()
+    assert client.get("/search/", {"q": "уникальныйтермин"}).context[
+        "page_obj"
+    ].object_list, (
+        "Убедитесь, что после migrate поисковый индекс снова следит за"
+        " изменениями публикаций."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_blog_rollback_drops_search_index():
+    call_command("migrate", "blog", "zero", verbosity=0)
+    try:
+        assert "blog_post_fts" not in (
+            connection.introspection.table_names()
+        ), (
+            "Убедитесь, что откат миграций blog удаляет поисковый"
+            " индекс вместе с таблицей публикаций."
+        )
+    finally:
+        call_command("migrate", "blog", verbosity=0)
+    assert get_search_backend().is_installed(connection)
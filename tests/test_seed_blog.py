@@ -0,0 +1,50 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count, F
+
+from blog.models import Comment, Post
+
+SEED_OPTIONS = {
+    "users": 5,
+    "categories": 3,
+    "locations": 3,
+    "posts": 30,
+    "comments": 60,
+}
+
+
+def seed(**options):
+    call_command("seed_blog", **SEED_OPTIONS, **options, stdout=StringIO())
+
+
+@pytest.mark.django_db(transaction=True)
+def test_seed_blog_creates_consistent_data():
+    seed()
+    assert get_user_model().objects.count() == SEED_OPTIONS["users"]
+    assert Post.objects.count() == SEED_OPTIONS["posts"]
+    assert Comment.objects.count() == SEED_OPTIONS["comments"]
+    assert not Post.objects.filter(excerpt="").exists(), (
+        "Убедитесь, что команда `seed_blog` заполняет `Post.excerpt`."
+    )
+    drift = Post.objects.annotate(
+        actual=Count("comments")
+    ).exclude(comment_count=F("actual"))
+    assert not drift.exists(), (
+        "Убедитесь, что после `seed_blog` счётчики комментариев верны."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_seed_blog_is_deterministic():
+    seed(prefix="first")
+    first = list(Post.objects.order_by("id").values_list("title", "text"))
+    seed(prefix="second")
+    second = list(
+        Post.objects.order_by("id").values_list("title", "text")
+    )[len(first):]
+    assert first == second, (
+        "Убедитесь, что одинаковый `--seed` даёт одинаковые данные."
+    )
@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+
+@pytest.mark.django_db
+def test_server_timing_header_and_log(
+        settings, caplog, client, post_with_published_location
+):
+    settings.SERVER_TIMING_SAMPLE_RATE = 1
+    with caplog.at_level("INFO", logger="blog.timing"):
+        response = client.get(f"/posts/{post_with_published_location.id}/")
+    header = response.headers["Server-Timing"]
+    for metric in ("db;", "view;", "render;", "total;"):
+        assert metric in header, (
+            f"Убедитесь, что заголовок Server-Timing содержит `{metric}`."
+        )
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["view"] == "blog:post_detail"
+    assert record["queries"] > 0
+
+
+@pytest.mark.django_db
+def test_server_timing_sampling(settings, client):
+    settings.SERVER_TIMING_SAMPLE_RATE = 0
+    assert "Server-Timing" not in client.get("/").headers, (
+        "Убедитесь, что вне выборки запросы не замеряются."
+    )
@@ -0,0 +1,62 @@
+import pytest
+
+from blog import sitemaps
+
+
+def read(response):
+    assert response.status_code == 200
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_sitemap_lists_visible_objects(
+        client, post_with_published_location,
+        unpublished_posts_with_published_locations
+):
+    post = post_with_published_location
+    hidden = unpublished_posts_with_published_locations[0]
+    index = read(client.get("/sitemap.xml"))
+    for section in ("posts", "categories", "profiles"):
+        assert f"/sitemap-{section}-0.xml" in index, (
+            f"Убедитесь, что индекс карты сайта ссылается на раздел"
+            f" `{section}`."
+        )
+
+    posts = read(client.get("/sitemap-posts-0.xml"))
+    assert f"/posts/{post.id}/</loc><lastmod>" in posts, (
+        "Убедитесь, что карта сайта содержит публикации с lastmod."
+    )
+    assert f"/posts/{hidden.id}/<" not in posts, (
+        "Убедитесь, что карта сайта не содержит скрытых публикаций."
+    )
+    assert f"/category/{post.category.slug}/" in read(
+        client.get("/sitemap-categories-0.xml")
+    )
+    assert f"/profile/{post.author.username}/" in read(
+        client.get("/sitemap-profiles-0.xml")
+    )
+    assert client.get("/sitemap-comments-0.xml").status_code == 404
+
+
+@pytest.mark.django_db
+def test_sitemap_shards_by_id_range(
+        monkeypatch, mixer, client, published_category, published_location
+):
+    monkeypatch.setattr(sitemaps, "SITEMAP_SHARD_SIZE", 2)
+    posts = mixer.cycle(5).blend(
+        "blog.Post", category=published_category,
+        location=published_location, is_published=True,
+        pub_date="2000-01-01T00:00:00Z",
+    )
+    index = read(client.get("/sitemap.xml"))
+    shards = [
+        shard for shard in range(4) if f"/sitemap-posts-{shard}.xml" in index
+    ]
+    assert shards == [0, 1, 2], (
+        "Убедитесь, что публикации разбиты на шарды по диапазонам id."
+    )
+    urls = "".join(
+        read(client.get(f"/sitemap-posts-{shard}.xml")) for shard in shards
+    )
+    for post in posts:
+        assert urls.count(f"/posts/{post.id}/<") == 1